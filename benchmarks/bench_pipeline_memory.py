@@ -0,0 +1,52 @@
+"""
+Peak RSS and wall time of `main.py encode` / `transcode` / `decode` under several
+--max-memory budgets (each run in a fresh process; POSIX only, peak RSS from getrusage).
+
+    python benchmarks/bench_pipeline_memory.py input.mp4 --budgets 0 64 16 4
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, "main.py")
+
+def run(argv):
+    """Runs main.py in a child process. Returns (seconds, peak RSS in MB of that child)."""
+    code = (f"import resource, runpy, sys; sys.argv = {argv!r}; runpy.run_path({MAIN!r}, run_name='__main__'); "
+            "sys.stderr.write('RSS:%d\\n' % resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)")
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+    elapsed = time.perf_counter() - start
+    rss = next(line for line in result.stderr.decode().splitlines() if line.startswith("RSS:"))
+    rss_kb = int(rss[4:]) / (1024 if sys.platform == "darwin" else 1)
+    return elapsed, rss_kb / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline memory budget benchmark")
+    parser.add_argument("input", help="Source video")
+    parser.add_argument("--budgets", type=int, nargs='+', default=[0, 64, 16, 4], help="--max-memory values in MB (0: no budget)")
+    parser.add_argument("--width", type=int, default=480, help="Encode width")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        encoded = os.path.join(temp_dir, "bench.mpgif")
+        run(["main.py", "encode", args.input, encoded, "--width", str(args.width), "--segment-size", "30"])
+        commands = {
+            "encode": ["main.py", "encode", args.input, os.path.join(temp_dir, "out.mpgif"), "--width", str(args.width)],
+            "transcode": ["main.py", "transcode", encoded, os.path.join(temp_dir, "small.mpgif"), "--width", str(args.width // 2)],
+            "decode": ["main.py", "decode", encoded, os.path.join(temp_dir, "out.mp4")],
+        }
+        print(f"{'command':<10} {'budget MB':>10} {'seconds':>8} {'peak RSS MB':>12}")
+        for name, argv in commands.items():
+            for budget in args.budgets:
+                extra = ["--max-memory", str(budget)] if budget else []
+                elapsed, rss = run(argv + extra)
+                print(f"{name:<10} {budget or '-':>10} {elapsed:8.2f} {rss:12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Frame time of the pygame render path, headless (SDL dummy video driver, no frame rate limit).
+
+    legacy : fromstring surfaces (no convert()), full blit + display.flip() every frame
+    native : display-format surfaces, only the changed region blitted and updated
+    scaled : same, window at --scale x the native size (frames scaled once, then cached)
+
+Reports frame-time percentiles over --loops passes over the file (the first pass of
+"scaled" includes building the scaled cache).
+
+    python benchmarks/bench_playback.py animation.mpgif --loops 5 --scale 2
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from PIL import Image
+from lecteur.player import MPGIFPlayer
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+def legacy_frames(reader):
+    frames = []
+    for frame_data in reader.frames:
+        pil_image = Image.open(io.BytesIO(frame_data)).convert("RGB")
+        frames.append(pygame.image.fromstring(pil_image.tobytes(), pil_image.size, pil_image.mode))
+    return frames
+
+def measure(render, count, loops):
+    times = []
+    for _ in range(loops):
+        for index in range(count):
+            start = time.perf_counter()
+            render(index)
+            times.append((time.perf_counter() - start) * 1000)
+    return times
+
+def main():
+    parser = argparse.ArgumentParser(description="Pygame playback render benchmark")
+    parser.add_argument("input", help=".mpgif file")
+    parser.add_argument("--loops", type=int, default=5, help="Passes over the file")
+    parser.add_argument("--scale", type=float, default=2.0, help="Window scale of the 'scaled' run")
+    args = parser.parse_args()
+
+    pygame.display.init()
+    player = MPGIFPlayer(args.input)
+    player.load()
+    native_size = (player.reader.width, player.reader.height)
+    player.set_window(native_size)
+    player.prepare_assets()
+    count = len(player.frames)
+    changed = sum(rect.width * rect.height for rect in player.dirty_rects if rect is not None)
+    print(f"{count} frames {native_size[0]}x{native_size[1]}, changed area: "
+          f"{100 * changed / (count * native_size[0] * native_size[1]):.0f}% of the pixels")
+
+    screen = player.screen
+    frames = legacy_frames(player.reader)
+    def render_legacy(index):
+        screen.blit(frames[index], (0, 0))
+        pygame.display.flip()
+
+    results = [("legacy", measure(render_legacy, count, args.loops))]
+    player.last_index = None
+    results.append(("native", measure(player.render_frame, count, args.loops)))
+    player.set_window((int(native_size[0] * args.scale), int(native_size[1] * args.scale)))
+    results.append((f"scaled x{args.scale:g}", measure(player.render_frame, count, args.loops)))
+
+    print(f"{'path':<12} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, times in results:
+        print(f"{name:<12} {percentile(times, 0.5):8.3f} {percentile(times, 0.95):8.3f} "
+              f"{percentile(times, 0.99):8.3f} {max(times):8.3f}")
+    pygame.quit()
+    player.cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Startup-time benchmark for the CLI.
+
+Runs `main.py info` (and other light subcommands) many times in fresh interpreters,
+reports the median / p95 wall time, and checks that no heavy module (tkinter, pygame,
+cv2, PIL, numpy) gets imported on those paths.
+
+    python benchmarks/bench_startup.py some_file.mpgif --runs 50
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, "main.py")
+HEAVY_MODULES = ("tkinter", "pygame", "cv2", "PIL", "numpy")
+
+PROBE = """
+import runpy, sys
+sys.argv = {argv!r}
+try:
+    runpy.run_path({main!r}, run_name="__main__")
+except SystemExit:
+    pass
+heavy = sorted(m for m in sys.modules if m.split('.')[0] in {heavy!r})
+sys.stderr.write("HEAVY:" + ",".join(heavy) + "\\n")
+"""
+
+def time_command(argv, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, MAIN] + argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=ROOT)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1 if len(timings) > 1 else 0]
+
+def heavy_imports(argv):
+    code = PROBE.format(argv=[MAIN] + argv, main=MAIN, heavy=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT)
+    for line in result.stderr.splitlines():
+        if line.startswith("HEAVY:"):
+            return [m for m in line[len("HEAVY:"):].split(",") if m]
+    return ["<probe failed>"]
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI startup benchmark")
+    parser.add_argument("mpgif", help="A .mpgif file used by the light subcommands")
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+
+    baseline = time_command(["--help"], args.runs)
+    print(f"{'python main.py --help':<40} median {baseline[0]:7.1f} ms   p95 {baseline[1]:7.1f} ms")
+
+    failed = False
+    for argv in (["info", args.mpgif], ["info", "--json", args.mpgif], ["verify", args.mpgif], ["decode", "--help"]):
+        median, p95 = time_command(argv, args.runs)
+        heavy = heavy_imports(argv)
+        status = "OK" if not heavy else "HEAVY: " + ", ".join(heavy)
+        failed |= bool(heavy)
+        print(f"{'python main.py ' + ' '.join(argv[:2]):<40} median {median:7.1f} ms   p95 {p95:7.1f} ms   {status}")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Per-frame cost of the encode hot loop: legacy PIL round trip vs array-native backends.
+
+    legacy : cv2.resize -> cv2.cvtColor -> Image.fromarray -> compress_frame_webp
+    pil    : resize_into (reused buffer) -> compress_array_webp(backend="pil")
+    cv2    : resize_into (reused buffer) -> compress_array_webp(backend="cv2")
+
+Reports time per frame and the transient memory allocated per frame (tracemalloc peak,
+numpy buffers included), i.e. the full-frame copies each path makes. Pillow's own image
+memory is allocated outside tracemalloc, so the one unpack copy of the "pil" path is not counted.
+
+    python benchmarks/bench_webp_backends.py [video.mp4] --width 480 --frames 60
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+from PIL import Image
+from compresseur.multimedia_utils import compress_frame_webp, compress_array_webp, resize_into
+
+def load_frames(path, count):
+    if path is None:
+        rng = np.random.default_rng(0)
+        base = rng.integers(0, 255, (720, 1280, 3), dtype=np.uint8)
+        return [np.roll(base, i * 8, axis=1) for i in range(count)]
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < count:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+def legacy(frame, width, height, quality):
+    frame = cv2.resize(frame, (width, height))
+    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    return compress_frame_webp(Image.fromarray(frame_rgb), quality=quality)
+
+def array_pil(frame, width, height, quality):
+    return compress_array_webp(resize_into(frame, width, height), quality=quality, backend="pil")
+
+def array_cv2(frame, width, height, quality):
+    return compress_array_webp(resize_into(frame, width, height), quality=quality, backend="cv2")
+
+def measure(encode, frames, width, height, quality):
+    encode(frames[0], width, height, quality)  # warm-up (buffers, codecs)
+    start = time.perf_counter()
+    total_bytes = sum(len(encode(frame, width, height, quality)) for frame in frames)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    peaks = []
+    for frame in frames[:10]:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        encode(frame, width, height, quality)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    return seconds * 1000 / len(frames), sum(peaks) / len(peaks), total_bytes / len(frames)
+
+def main():
+    parser = argparse.ArgumentParser(description="WebP encoding backends benchmark")
+    parser.add_argument("video", nargs="?", default=None, help="Source video (synthetic 1280x720 frames if omitted)")
+    parser.add_argument("--width", type=int, default=480)
+    parser.add_argument("--quality", type=int, default=75)
+    parser.add_argument("--frames", type=int, default=60)
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.frames)
+    src_h, src_w = frames[0].shape[:2]
+    height = int(src_h * args.width / src_w)
+    frame_bytes = args.width * height * 3
+    print(f"{len(frames)} frames {src_w}x{src_h} -> {args.width}x{height}, q={args.quality}")
+    print(f"{'path':<8} {'ms/frame':>9} {'alloc/frame':>12} {'frame copies':>13} {'webp bytes':>11}")
+    for name, encode in (("legacy", legacy), ("pil", array_pil), ("cv2", array_cv2)):
+        ms, alloc, size = measure(encode, frames, args.width, height, args.quality)
+        print(f"{name:<8} {ms:9.2f} {alloc / 1024:10.0f}KB {alloc / frame_bytes:13.1f} {size:11.0f}")
+
+if __name__ == "__main__":
+    main()
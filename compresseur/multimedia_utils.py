@@ -1,12 +1,13 @@
 import os
 import subprocess
 import io
-from PIL import Image
-
-import urllib.request
-import numpy as np
-
 import sys
+import threading
+from typing import TYPE_CHECKING
+
+# PIL and numpy are imported where they are used, so that FFmpeg-only callers start fast.
+if TYPE_CHECKING:
+    from PIL import Image
 if getattr(sys, 'frozen', False):
     BASE_DIR = os.path.dirname(sys.executable)
 else:
@@ -15,8 +16,19 @@ else:
 LOCAL_FFMPEG = os.path.join(BASE_DIR, 'ffmpeg.exe')
 FFMPEG_CMD = None
 
+# Backends of compress_array_webp (frames as BGR numpy arrays, as decoded by OpenCV):
+#   "pil" : Pillow reads the BGR buffer directly (same output as compress_frame_webp, method=6)
+#   "cv2" : cv2.imencode('.webp'), no Pillow object at all (faster, libwebp default method)
+WEBP_BACKEND_PIL = "pil"
+WEBP_BACKEND_CV2 = "cv2"
+WEBP_BACKENDS = (WEBP_BACKEND_PIL, WEBP_BACKEND_CV2)
+WEBP_BACKEND = WEBP_BACKEND_PIL
+
+_resize_buffers = threading.local()
+
 def download_ffmpeg():
     """Downloads a static FFmpeg binary for Windows."""
+    import urllib.request
     url = "https://github.com/imageio/imageio-binaries/raw/master/ffmpeg/ffmpeg-win64-v4.2.2.exe"
     try:
         dest = os.path.join(BASE_DIR, 'ffmpeg.exe')
@@ -49,10 +61,12 @@ def get_ffmpeg_cmd():
     
     return 'ffmpeg'
 
-def create_delta_image(curr_img: Image.Image, prev_img: Image.Image, threshold=30) -> Image.Image:
+def create_delta_image(curr_img: "Image.Image", prev_img: "Image.Image", threshold=30) -> "Image.Image":
     """
     Creates a delta image (RGBa) where pixels similar to prev_img are transparent.
     """
+    import numpy as np
+    from PIL import Image
     curr_arr = np.array(curr_img.convert("RGB"))
     prev_arr = np.array(prev_img.convert("RGB"))
     
@@ -66,7 +80,7 @@ def create_delta_image(curr_img: Image.Image, prev_img: Image.Image, threshold=3
     
     return Image.fromarray(delta_arr)
 
-def compress_frame_webp(image: Image.Image, quality=80, lossless=False) -> bytes:
+def compress_frame_webp(image: "Image.Image", quality=80, lossless=False) -> bytes:
     """
     Compress a PIL Image to WebP bytes.
     """
@@ -74,10 +88,61 @@ def compress_frame_webp(image: Image.Image, quality=80, lossless=False) -> bytes
     image.save(output, format="WEBP", quality=quality, lossless=lossless, method=6)
     return output.getvalue()
 
-def decompress_frame_webp(webp_data: bytes) -> Image.Image:
+def set_webp_backend(backend: str):
+    """Selects the default backend of compress_array_webp ("pil" or "cv2")."""
+    global WEBP_BACKEND
+    if backend not in WEBP_BACKENDS:
+        raise ValueError(f"Unknown WebP backend: {backend} (expected one of {WEBP_BACKENDS})")
+    WEBP_BACKEND = backend
+
+def resize_into(frame, width: int, height: int):
+    """
+    Resizes a frame into a preallocated per-thread buffer (reused by the next call of the
+    same thread, so encode it before resizing the next frame). Frames already at the
+    target size are returned as is.
+    """
+    import cv2
+    import numpy as np
+    if frame.shape[1] == width and frame.shape[0] == height:
+        return frame
+    buffers = getattr(_resize_buffers, "buffers", None)
+    if buffers is None:
+        buffers = _resize_buffers.buffers = {}
+    shape = (height, width) + frame.shape[2:]
+    dst = buffers.get((shape, frame.dtype))
+    if dst is None:
+        dst = buffers[(shape, frame.dtype)] = np.empty(shape, dtype=frame.dtype)
+    cv2.resize(frame, (width, height), dst=dst)
+    return dst
+
+def compress_array_webp(frame_bgr, quality=80, backend=None, channel_order="BGR") -> bytes:
+    """
+    Compress a BGR uint8 array (H x W x 3) to WebP bytes without the
+    cvtColor -> Image.fromarray round trip. Use channel_order="RGB" for RGB arrays.
+    """
+    backend = backend or WEBP_BACKEND
+    if backend == WEBP_BACKEND_CV2:
+        import cv2
+        if channel_order == "RGB":
+            frame_bgr = cv2.cvtColor(frame_bgr, cv2.COLOR_RGB2BGR)
+        ok, buffer = cv2.imencode('.webp', frame_bgr, [cv2.IMWRITE_WEBP_QUALITY, max(1, quality)])
+        if not ok:
+            raise ValueError("cv2.imencode('.webp') failed")
+        return buffer.tobytes()
+
+    import numpy as np
+    from PIL import Image
+    if not frame_bgr.flags['C_CONTIGUOUS']:
+        frame_bgr = np.ascontiguousarray(frame_bgr)
+    height, width = frame_bgr.shape[:2]
+    image = Image.frombuffer("RGB", (width, height), frame_bgr, "raw", channel_order, 0, 1)
+    return compress_frame_webp(image, quality=quality)
+
+def decompress_frame_webp(webp_data: bytes) -> "Image.Image":
     """
     Decompress WebP bytes to a PIL Image.
     """
+    from PIL import Image
     return Image.open(io.BytesIO(webp_data))
 
 def extract_audio_from_video(video_path: str, output_audio_path: str):
@@ -95,6 +160,19 @@ def extract_audio_from_video(video_path: str, output_audio_path: str):
     ]
     subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
 
+def has_audio_stream(video_path: str) -> bool:
+    """
+    Tells whether FFmpeg sees an audio stream in a file (from the stream list it prints
+    when opening it). Raises OSError if FFmpeg cannot open the file at all.
+    """
+    import re
+    result = subprocess.run([get_ffmpeg_cmd(), '-hide_banner', '-i', video_path],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    log = result.stderr.decode('utf-8', 'replace')
+    if not re.search(r"Stream #\d+:\d+.*?: Video:", log) and not re.search(r"Stream #\d+:\d+.*?: Audio:", log):
+        raise OSError(f"FFmpeg cannot read {video_path}")
+    return re.search(r"Stream #\d+:\d+.*?: Audio:", log) is not None
+
 def compress_audio_mp3(input_audio_path: str) -> bytes:
     """
     Compresses an audio file to MP3 bytes using FFmpeg.
@@ -123,9 +201,46 @@ def compress_audio_mp3(input_audio_path: str) -> bytes:
         if os.path.exists(output_temp):
             os.remove(output_temp)
 
+def compress_pcm_mp3(pcm_data, sample_rate=44100, channels=2) -> bytes:
+    """
+    Compresses raw PCM (signed 16-bit little-endian, interleaved) to MP3 bytes,
+    through FFmpeg pipes (no temporary file).
+    """
+    cmd = [
+        get_ffmpeg_cmd(), '-v', 'error',
+        '-f', 's16le', '-ar', str(sample_rate), '-ac', str(channels), '-i', 'pipe:0',
+        '-c:a', 'libmp3lame', '-q:a', '4', '-f', 'mp3', 'pipe:1'
+    ]
+    result = subprocess.run(cmd, input=bytes(pcm_data), stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+    return result.stdout
+
 def save_audio_to_file(audio_data: bytes, output_path: str):
     """
     Saves audio bytes to a file (e.g., .opus).
     """
     with open(output_path, 'wb') as f:
         f.write(audio_data)
+
+def decode_audio_pcm(audio_data: bytes, audio_format: str, start: float, duration: float,
+                     sample_rate=44100, channels=2) -> bytes:
+    """
+    Decodes [start, start + duration) of compressed audio bytes to raw s16le PCM, through pipes.
+    Audio shorter than the range is padded with silence (apad), so the PCM lasts exactly `duration`.
+    """
+    cmd = [get_ffmpeg_cmd(), '-v', 'error', '-f', audio_format, '-i', 'pipe:0',
+           '-ss', f"{start:.3f}", '-af', 'apad', '-t', f"{duration:.3f}",
+           '-f', 's16le', '-ar', str(sample_rate), '-ac', str(channels), 'pipe:1']
+    result = subprocess.run(cmd, input=audio_data, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+    return result.stdout
+
+def trim_audio_copy(audio_data: bytes, audio_format: str, start: float, duration: float = None) -> bytes:
+    """
+    Cuts compressed audio bytes with FFmpeg stream copy (no re-encoding), through pipes.
+    audio_format is the FFmpeg muxer name ('mp3', 'ogg', 'adts').
+    """
+    cmd = [get_ffmpeg_cmd(), '-v', 'error', '-f', audio_format, '-i', 'pipe:0', '-ss', f"{start:.3f}"]
+    if duration is not None:
+        cmd.extend(['-t', f"{duration:.3f}"])
+    cmd.extend(['-c', 'copy', '-f', audio_format, 'pipe:1'])
+    result = subprocess.run(cmd, input=audio_data, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+    return result.stdout
@@ -0,0 +1,204 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from functools import partial
+import cv2
+from fichier.mpgif_structure import MPGIFReader, CODEC_MP3
+from compresseur.multimedia_utils import get_ffmpeg_cmd
+from convertisseur.converter import _extract_segment
+from convertisseur.encoder import MPGIFEncoder
+
+async def _stop_process(proc):
+    """Kills an FFmpeg process that is still running (cancellation or error)."""
+    if proc is not None and proc.returncode is None:
+        try:
+            proc.kill()
+        except ProcessLookupError:
+            pass
+        # A paused pipe reader never sees EOF, and wait() would hang: drain what is left.
+        for stream in (proc.stdout, proc.stderr):
+            if stream is not None:
+                await stream.read()
+        await proc.wait()
+
+def _probe_video(input_path):
+    cap = cv2.VideoCapture(input_path)
+    try:
+        return (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                cap.get(cv2.CAP_PROP_FPS),
+                int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+    finally:
+        cap.release()
+
+async def _read_audio_mp3(input_path):
+    """Extracts and compresses the audio track to MP3 in one FFmpeg pass, through a pipe."""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            get_ffmpeg_cmd(), '-v', 'error', '-i', input_path,
+            '-vn', '-c:a', 'libmp3lame', '-q:a', '4', '-f', 'mp3', 'pipe:1',
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL)
+    except OSError as e:
+        print(f"⚠️ Audio extraction failed: {e}")
+        return None
+    try:
+        audio_data, _ = await proc.communicate()
+    finally:
+        await _stop_process(proc)
+    if proc.returncode != 0 or not audio_data:
+        return None
+    return audio_data
+
+async def _read_rgb_frames(stream, width, height):
+    """Raw rgb24 frames of an FFmpeg pipe, as (height, width, 3) uint8 arrays."""
+    import numpy as np
+    frame_size = width * height * 3
+    while True:
+        try:
+            data = await stream.readexactly(frame_size)
+        except asyncio.IncompleteReadError:
+            return
+        yield np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3)
+
+async def video_to_mpgif_async(input_path, output_path, target_fps=15, width=480, height=None, quality=75, loop=0,
+                               segment_size=0, checksums=False, executor=None, max_pending=None):
+    """
+    Asynchronous counterpart of video_to_mpgif, as an async iterator of progress tuples
+    (current, total, elapsed, eta), like progress_callback:
+
+        async for current, total, elapsed, eta in video_to_mpgif_async("in.mp4", "out.mpgif"):
+            ...
+
+    FFmpeg decodes and resamples the video into raw RGB frames on a pipe; they go through
+    MPGIFEncoder.encode_async, which compresses them in `executor` (default loop executor)
+    and streams them to disk. Cancelling the task kills FFmpeg and removes the partial
+    output; wrap the iterator in contextlib.aclosing() to get the same cleanup when
+    leaving the loop early.
+    """
+    if not os.path.exists(input_path):
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+
+    event_loop = asyncio.get_running_loop()
+    orig_width, orig_height, source_fps, source_frames = await event_loop.run_in_executor(executor, _probe_video, input_path)
+    if height is None:
+        height = int(orig_height * width / orig_width)
+    total = int(source_frames / source_fps * target_fps) if source_fps > 0 else 0
+    total = max(total, 1)
+
+    # Progress tuples come from the encoder's callback (called in the event loop); None ends the stream.
+    progress = asyncio.Queue()
+    encoder = proc = audio_task = stderr_task = encode_task = None
+    completed = False
+    try:
+        encoder = MPGIFEncoder(output_path, width, height, target_fps, quality=quality, loop=loop,
+                               segment_size=segment_size, checksums=checksums, executor=executor,
+                               max_pending=max_pending, progress_callback=lambda *p: progress.put_nowait(p),
+                               total_frames=total)
+        audio_task = asyncio.create_task(_read_audio_mp3(input_path))
+        proc = await asyncio.create_subprocess_exec(
+            get_ffmpeg_cmd(), '-v', 'error', '-i', input_path, '-an',
+            '-vf', f'fps={target_fps},scale={width}:{height}',
+            '-f', 'rawvideo', '-pix_fmt', 'rgb24', 'pipe:1',
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        stderr_task = asyncio.create_task(proc.stderr.read())
+
+        async def encode():
+            try:
+                await encoder.encode_async(_read_rgb_frames(proc.stdout, width, height))
+            finally:
+                progress.put_nowait(None)
+
+        print(f"🔄 Processing {input_path}...")
+        encode_task = asyncio.create_task(encode())
+        while True:
+            item = await progress.get()
+            if item is None:
+                break
+            yield item
+        await encode_task
+
+        await proc.wait()
+        stderr = await stderr_task
+        if proc.returncode != 0:
+            raise RuntimeError(f"FFmpeg decoding failed ({proc.returncode}): {stderr.decode('utf-8', 'replace')}")
+
+        audio_data = await audio_task
+        if audio_data:
+            encoder.set_audio(audio_data, codec=CODEC_MP3)
+        await event_loop.run_in_executor(executor, encoder.close)
+        completed = True
+        print(f"✨ Conversion completed : {output_path} ({encoder.frame_count} frames)")
+    finally:
+        for task in (encode_task, audio_task, stderr_task):
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(*(task for task in (encode_task, stderr_task) if task is not None), return_exceptions=True)
+        await _stop_process(proc)
+        if audio_task is not None:
+            await asyncio.gather(audio_task, return_exceptions=True)
+        if encoder is not None and not completed:
+            encoder.abort()
+
+async def mpgif_to_video_async(input_path, output_path, executor=None):
+    """
+    Asynchronous counterpart of mpgif_to_video, as an async iterator of progress tuples
+    (current, total, elapsed, eta) parsed from FFmpeg's -progress output.
+    Cancelling kills FFmpeg and removes the temporary frames and the partial output.
+    """
+    event_loop = asyncio.get_running_loop()
+    reader = MPGIFReader(input_path)
+    await event_loop.run_in_executor(executor, reader.read_index)
+
+    temp_dir = tempfile.mkdtemp()
+    proc = stderr_task = None
+    writing = completed = False
+    try:
+        await asyncio.gather(*(event_loop.run_in_executor(executor, _extract_segment, reader, index, temp_dir)
+                               for index in range(len(reader.segments))))
+        await event_loop.run_in_executor(executor, reader.read_audio)
+
+        cmd = [get_ffmpeg_cmd(), '-y', '-v', 'error', '-nostats', '-progress', 'pipe:1',
+               '-framerate', str(reader.fps),
+               '-i', os.path.join(temp_dir, "frame_%04d.webp").replace("\\", "/")]
+        if reader.audio_data:
+            ext = ".mp3" if reader.audio_codec == CODEC_MP3 else ".opus"
+            audio_path = os.path.join(temp_dir, f"audio{ext}")
+            await event_loop.run_in_executor(executor, partial(_write_bytes, audio_path, reader.audio_data))
+            cmd.extend(['-i', audio_path])
+        cmd.extend(['-c:v', 'libx264', '-pix_fmt', 'yuv420p'])
+        if reader.audio_data:
+            cmd.extend(['-c:a', 'aac', '-b:a', '128k'])
+        cmd.append(output_path)
+
+        writing = True
+        proc = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        stderr_task = asyncio.create_task(proc.stderr.read())
+        total = max(reader.frame_count, 1)
+        start_time = time.time()
+        async for line in proc.stdout:
+            key, _, value = line.decode('ascii', 'replace').strip().partition('=')
+            if key == 'frame' and value.isdigit() and int(value) > 0:
+                current = int(value)
+                elapsed = time.time() - start_time
+                yield current, total, elapsed, (total - current) * elapsed / current
+
+        await proc.wait()
+        stderr = await stderr_task
+        if proc.returncode != 0:
+            raise RuntimeError(f"FFmpeg muxing failed ({proc.returncode}): {stderr.decode('utf-8', 'replace')}")
+        completed = True
+        print(f"✨ Restored video: {output_path}")
+    finally:
+        if stderr_task is not None:
+            stderr_task.cancel()
+            await asyncio.gather(stderr_task, return_exceptions=True)
+        await _stop_process(proc)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        if writing and not completed and os.path.exists(output_path):
+            os.remove(output_path)
+
+def _write_bytes(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
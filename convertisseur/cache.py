@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import threading
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+HASH_CHUNK = 1024 * 1024
+
+class SourceCache:
+    """
+    On-disk cache of what video_to_mpgif derives from a source video, so that encoding
+    the same source again (other quality, loop, segment size...) skips straight to
+    WebP compression.
+
+    Entries are keyed by the SHA-256 of the source content:
+
+        <cache_dir>/<hash>/probe.json                   width, height, frame count, fps
+        <cache_dir>/<hash>/audio.mp3                    compressed audio block (empty: silent source)
+        <cache_dir>/<hash>/frames_<step>_<w>x<h>.bgr    sampled and resized frames, raw BGR uint8
+
+    Frame files are read back through a read-only numpy.memmap (no decoding, no copy).
+    Files are written under a temporary name and renamed when complete; the least
+    recently used ones are evicted once the cache exceeds max_bytes.
+    """
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES, store_frames=True):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.store_frames = store_frames
+        self.lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def source_key(self, input_path):
+        """
+        Content hash of a source file. Hashes are remembered per (path, size, mtime) in
+        sources.json, so an unchanged file is read only once.
+        """
+        stat = os.stat(input_path)
+        path = os.path.abspath(input_path)
+        signature = [stat.st_size, stat.st_mtime_ns]
+        sources_path = os.path.join(self.cache_dir, "sources.json")
+        with self.lock:
+            sources = self._load_json(sources_path) or {}
+            known = sources.get(path)
+            if known and known[:2] == signature:
+                return known[2]
+
+        digest = hashlib.sha256()
+        with open(input_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+                digest.update(chunk)
+        key = digest.hexdigest()
+
+        with self.lock:
+            sources = self._load_json(sources_path) or {}
+            sources[path] = signature + [key]
+            self._write_atomic(sources_path, json.dumps(sources).encode())
+        return key
+
+    def _entry(self, key, name):
+        return os.path.join(self.cache_dir, key, name)
+
+    @staticmethod
+    def _load_json(path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_atomic(path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def _touch(self, path):
+        try:
+            os.utime(path)
+            return True
+        except OSError:
+            return False
+
+    def get_probe(self, key):
+        """Returns the probe dict {"width", "height", "frames", "fps"} or None."""
+        path = self._entry(key, "probe.json")
+        probe = self._load_json(path)
+        if probe is not None:
+            self._touch(path)
+        return probe
+
+    def put_probe(self, key, probe):
+        self._write_atomic(self._entry(key, "probe.json"), json.dumps(probe).encode())
+
+    def get_audio(self, key):
+        """Returns (found, audio_data); audio_data is None for a silent source."""
+        path = self._entry(key, "audio.mp3")
+        if not self._touch(path):
+            return False, None
+        with open(path, 'rb') as f:
+            return True, f.read() or None
+
+    def put_audio(self, key, audio_data):
+        """Stores the compressed audio; None (or b'') only for a source without audio stream."""
+        self._write_atomic(self._entry(key, "audio.mp3"), audio_data or b'')
+        self.evict()
+
+    def _frames_name(self, step, width, height):
+        return f"frames_{step}_{width}x{height}.bgr"
+
+    def get_frames(self, key, step, width, height):
+        """Returns the cached frames as a read-only (N, height, width, 3) uint8 memmap, or None."""
+        import numpy as np
+        path = self._entry(key, self._frames_name(step, width, height))
+        if not self._touch(path):
+            return None
+        frame_size = width * height * 3
+        count = os.path.getsize(path) // frame_size
+        if count == 0:
+            return None
+        return np.memmap(path, dtype=np.uint8, mode='r', shape=(count, height, width, 3))
+
+    def frame_writer(self, key, step, width, height):
+        return FrameCacheWriter(self, self._entry(key, self._frames_name(step, width, height)))
+
+    def evict(self):
+        """Removes the least recently used files until the cache fits in max_bytes."""
+        with self.lock:
+            files = []
+            total = 0
+            for root, _, names in os.walk(self.cache_dir):
+                for name in names:
+                    path = os.path.join(root, name)
+                    if name == "sources.json" or name.endswith(".tmp"):
+                        continue
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, path))
+                    total += stat.st_size
+            files.sort()
+            for _, size, path in files:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    # Still mapped by a running encode (Windows): kept for now.
+                    pass
+            for root, dirs, names in os.walk(self.cache_dir, topdown=False):
+                if root != self.cache_dir and not dirs and not names:
+                    try:
+                        os.rmdir(root)
+                    except OSError:
+                        pass
+
+    def clear(self):
+        max_bytes, self.max_bytes = self.max_bytes, -1
+        try:
+            self.evict()
+        finally:
+            self.max_bytes = max_bytes
+
+class FrameCacheWriter:
+    """Appends resized BGR frames to a temporary file, published by commit() (dropped by abort())."""
+    def __init__(self, cache, path):
+        self.cache = cache
+        self.path = path
+        self.temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.file = open(self.temp_path, 'wb')
+
+    def write(self, frame):
+        self.file.write(frame.data if frame.flags['C_CONTIGUOUS'] else frame.tobytes())
+
+    def commit(self):
+        self.file.close()
+        os.replace(self.temp_path, self.path)
+        self.cache.evict()
+
+    def abort(self):
+        self.file.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
@@ -1,113 +1,314 @@
-import cv2
+import io
 import os
 import shutil
 import tempfile
 import subprocess
-from PIL import Image
+from concurrent.futures import ThreadPoolExecutor
 from fichier.mpgif_structure import MPGIFWriter, MPGIFReader
-from compresseur.multimedia_utils import compress_frame_webp, compress_audio_mp3, extract_audio_from_video, get_ffmpeg_cmd, create_delta_image
-from fichier.mpgif_structure import MPGIFWriter, MPGIFReader, CODEC_MP3
+from compresseur.multimedia_utils import compress_frame_webp, compress_audio_mp3, extract_audio_from_video, get_ffmpeg_cmd, create_delta_image, has_audio_stream
+from fichier.mpgif_structure import MPGIFWriter, MPGIFReader, CODEC_MP3, VERSION_SEGMENTED, VERSION_CHECKED
+from convertisseur.encoder import MPGIFEncoder
+from convertisseur.pipeline import Pipeline
 
-def video_to_mpgif(input_path, output_path, target_fps=15, width=480, height=None, quality=75, loop=0, progress_callback=None):
+# Estimated raw RGB / WebP size ratio, to size the queues holding compressed frames.
+WEBP_SIZE_RATIO = 10
+
+def rendition_output_path(output_path, width, quality):
+    """Default file name of a rendition: out.mpgif -> out_480w_q75.mpgif"""
+    base, ext = os.path.splitext(output_path)
+    return f"{base}_{width}w_q{quality}{ext or '.mpgif'}"
+
+def _sample_frames(cap, frame_interval):
+    """Decodes a cv2.VideoCapture and yields one frame every frame_interval."""
+    count = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if count % frame_interval == 0:
+            yield frame
+        count += 1
+
+def video_to_mpgif(input_path, output_path, target_fps=15, width=480, height=None, quality=75, loop=0, progress_callback=None, segment_size=0, checksums=False, executor=None, renditions=None, cache=None, max_memory=None, workers=None):
     """
     Converts a video file (MP4, WebM, GIF) to .mpgif.
+    If an executor is given, frames are compressed in it (a bounded number in flight, order kept);
+    workers is its number of threads (default: CPU count).
+
+    renditions: optional list of dicts {"width", "quality", "height" (optional), "output" (optional)}.
+    The source is then decoded once and its audio compressed once, and every kept frame is
+    resized and compressed for each rendition. Without "output", a rendition is written to
+    rendition_output_path(output_path, width, quality).
+
+    cache: optional SourceCache (or cache directory). The probe, the compressed audio and
+    (if the cache stores frames) the sampled and resized frames are reused from a previous
+    encode of the same source content, or stored for the next one.
+
+    Decoding, compression and writing run as a Pipeline; max_memory (bytes) bounds the
+    frames held between the stages (and prints the stage metrics).
+    Returns the number of frames written (per rendition).
     """
+    # OpenCV is only needed for encoding: `decode` and `info` do not pay for its import.
+    import cv2
+
     if not os.path.exists(input_path):
         raise FileNotFoundError(f"Input file not found: {input_path}")
+    if renditions is not None and not renditions:
+        raise ValueError("renditions must contain at least one rendition")
+    if isinstance(cache, str):
+        from convertisseur.cache import SourceCache
+        cache = SourceCache(cache)
 
     temp_dir = tempfile.mkdtemp()
+    cap = None
+    frame_writers = []
     try:
         print(f"🔄 Processing {input_path}...")
-        
-        cap = cv2.VideoCapture(input_path)
-        if not cap.isOpened():
-             pass 
-
-        orig_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        orig_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) 
-        if height is None:
-            ratio = width / orig_width
-            height = int(orig_height * ratio)
-
-        audio_temp_path = os.path.join(temp_dir, "audio.wav")
-        audio_data = None
-        try:
-            extract_audio_from_video(input_path, audio_temp_path)
-            if os.path.exists(audio_temp_path):
-                print("🎵 Compressing Audio (MP3)...")
-                audio_data = compress_audio_mp3(audio_temp_path)
-        except Exception as e:
-            print(f"⚠️ Audio extraction failed (might be silent video): {e}")
 
-        writer = MPGIFWriter(output_path, width, height, target_fps, loop)
-        if audio_data:
-            writer.set_audio(audio_data, codec=CODEC_MP3)
+        key = cache.source_key(input_path) if cache else None
+        probe = cache.get_probe(key) if cache else None
+        if probe is None:
+            cap = cv2.VideoCapture(input_path)
+            probe = {"width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                     "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                     "frames": int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+                     "fps": cap.get(cv2.CAP_PROP_FPS)}
+            if cache:
+                cache.put_probe(key, probe)
+        else:
+            print(f"🗃️ Source in cache ({key[:12]})")
+
+        orig_width = probe["width"]
+        orig_height = probe["height"]
+        total_frames = probe["frames"]
+        if renditions is None:
+            renditions = [{"output": output_path, "width": width, "height": height, "quality": quality}]
+        outputs = []
+        for rendition in renditions:
+            r_width = rendition["width"]
+            r_quality = rendition.get("quality", quality)
+            r_height = rendition.get("height") or int(orig_height * r_width / orig_width)
+            r_output = rendition.get("output") or rendition_output_path(output_path, r_width, r_quality)
+            outputs.append((r_output, r_width, r_height, r_quality))
+
+        found, audio_data = cache.get_audio(key) if cache else (False, None)
+        if not found:
+            audio_temp_path = os.path.join(temp_dir, "audio.wav")
+            try:
+                extract_audio_from_video(input_path, audio_temp_path)
+                if os.path.exists(audio_temp_path):
+                    print("🎵 Compressing Audio (MP3)...")
+                    audio_data = compress_audio_mp3(audio_temp_path)
+            except Exception as e:
+                print(f"⚠️ Audio extraction failed (might be silent video): {e}")
+            if cache:
+                # Only a real MP3, or a source FFmpeg reports without any audio stream, is cached:
+                # a failed extraction must not make every later encode silent.
+                if audio_data:
+                    cache.put_audio(key, audio_data)
+                else:
+                    try:
+                        if not has_audio_stream(input_path):
+                            cache.put_audio(key, None)
+                    except OSError:
+                        pass
 
         print("🖼️ Extracting and Compressing Frames...")
-        frame_interval = int(cap.get(cv2.CAP_PROP_FPS) / target_fps)
+        frame_interval = int(probe["fps"] / target_fps)
         if frame_interval < 1: frame_interval = 1
-        
-        count = 0
-        saved_count = 0
-
-        import time
-        start_time = time.time()
         total_frames_target = int(total_frames / frame_interval) if frame_interval > 0 else 0
         if total_frames_target == 0: total_frames_target = 1
 
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            
-            if count % frame_interval == 0:
-                frame = cv2.resize(frame, (width, height))
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                pil_img = Image.fromarray(frame_rgb)
-                
-                webp_data = compress_frame_webp(pil_img, quality=quality)
-                writer.add_frame(webp_data)
-                
-                saved_count += 1
-                
-                if progress_callback:
-                    elapsed = time.time() - start_time
-                    if saved_count > 0:
-                        avg_time_per_frame = elapsed / saved_count
-                        remaining_frames = total_frames_target - saved_count
-                        eta = remaining_frames * avg_time_per_frame
-                        progress = (saved_count / total_frames_target) * 100
-                        progress_callback(saved_count, total_frames_target, elapsed, eta)
-
-            count += 1
-            
-        cap.release()
-        
-        writer.write()
-        print(f"✨ Conversion completed : {output_path} ({saved_count} frames)")
+        # One encoder per rendition, all fed from the same decoded frames; progress is
+        # reported by the last one (the others are at least as far).
+        encoders = []
+        for i, (r_output, r_width, r_height, r_quality) in enumerate(outputs):
+            encoder = MPGIFEncoder(r_output, r_width, r_height, target_fps, quality=r_quality, loop=loop,
+                                   segment_size=segment_size, checksums=checksums,
+                                   channel_order="BGR", total_frames=total_frames_target,
+                                   progress_callback=progress_callback if i == len(outputs) - 1 else None)
+            if audio_data:
+                encoder.set_audio(audio_data, codec=CODEC_MP3)
+            encoders.append(encoder)
+
+        # Renditions of the same size (e.g. two qualities per width) share their resized frames
+        # and their cache file.
+        sizes = []
+        for _, r_width, r_height, _ in outputs:
+            if (r_width, r_height) not in sizes:
+                sizes.append((r_width, r_height))
+        size_index = [sizes.index((r_width, r_height)) for _, r_width, r_height, _ in outputs]
+
+        cached_frames = None
+        if cache and cache.store_frames:
+            cached_frames = [cache.get_frames(key, frame_interval, r_width, r_height) for r_width, r_height in sizes]
+            if any(frames is None for frames in cached_frames):
+                cached_frames = None
+                frame_writers = [cache.frame_writer(key, frame_interval, r_width, r_height) for r_width, r_height in sizes]
+
+        # decode -> [resize + cache] -> compress (pooled) -> write, with bounded queues in between.
+        # An item is one source frame, or one frame per rendition (list) once resized.
+        rendition_bytes = sum(r_width * r_height * 3 for r_width, r_height in sizes)
+        pipeline = Pipeline("encode", max_memory=max_memory)
+        if cached_frames is not None:
+            print(f"🗃️ {len(cached_frames[0])} frames read from the cache")
+            pipeline.source("cache", ([frames[i] for i in size_index] for frames in zip(*cached_frames)),
+                            item_bytes=rendition_bytes)
+        else:
+            if cap is None:
+                cap = cv2.VideoCapture(input_path)
+            pipeline.source("decode", _sample_frames(cap, frame_interval), item_bytes=orig_width * orig_height * 3)
+            if frame_writers:
+                def resize(frame):
+                    # Resized once here, stored, then compressed as is by the encoders.
+                    r_frames = []
+                    for (r_width, r_height), frame_writer in zip(sizes, frame_writers):
+                        r_frame = frame
+                        if frame.shape[:2] != (r_height, r_width):
+                            r_frame = cv2.resize(frame, (r_width, r_height))
+                        frame_writer.write(r_frame)
+                        r_frames.append(r_frame)
+                    return [r_frames[i] for i in size_index]
+                pipeline.stage("resize", resize, item_bytes=rendition_bytes, work_bytes=rendition_bytes)
+
+        def compress(frames):
+            if not isinstance(frames, list):
+                frames = [frames] * len(encoders)
+            return [encoder.compress(frame) for encoder, frame in zip(encoders, frames)]
+
+        def write(webp_frames):
+            for encoder, webp_data in zip(encoders, webp_frames):
+                encoder.add_compressed(webp_data)
+
+        pipeline.stage("compress", compress, workers=(workers or os.cpu_count() or 1) if executor else 1, executor=executor,
+                       item_bytes=rendition_bytes // WEBP_SIZE_RATIO, work_bytes=2 * rendition_bytes)
+        try:
+            pipeline.run(write)
+            if max_memory:
+                print(pipeline.report())
+
+            for encoder in encoders:
+                saved_count = encoder.close()
+                print(f"✨ Conversion completed : {encoder.output_path} ({saved_count} frames)")
+            for frame_writer in frame_writers:
+                frame_writer.commit()
+            frame_writers = []
+        except BaseException:
+            for encoder in encoders:
+                encoder.abort()
+            raise
+        return saved_count
         
     finally:
+        if cap is not None:
+            cap.release()
+        for frame_writer in frame_writers:
+            frame_writer.abort()
         shutil.rmtree(temp_dir)
 
-def mpgif_to_video(input_path, output_path):
+def _transcode_frame(frame_data, width, height, quality):
+    from PIL import Image
+    image = Image.open(io.BytesIO(frame_data))
+    # Reduced-size decoding where the codec supports it (no-op for WebP in current Pillow).
+    image.draft("RGB", (width, height))
+    if image.size != (width, height):
+        image = image.convert("RGB").resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+    return compress_frame_webp(image, quality=quality)
+
+def mpgif_to_mpgif(input_path, output_path, width=None, height=None, quality=75, executor=None, progress_callback=None, max_memory=None, workers=None):
+    """
+    Resizes and/or re-compresses a .mpgif directly (no intermediate H.264 generation).
+    Segments are read one at a time and frames decoded/re-encoded in the executor (of `workers`
+    threads, default: CPU count) with a bounded number in flight (a Pipeline, sized by
+    max_memory in bytes when given); the output is streamed to disk and the audio block
+    copied untouched.
+    Returns the number of frames written.
+    """
+    import time
+    reader = MPGIFReader(input_path)
+    reader.read_index()
+    if width is None:
+        width = reader.width
+    if height is None:
+        height = int(reader.height * width / reader.width)
+
+    writer = MPGIFWriter(output_path, width, height, reader.fps, reader.loop_count,
+                         segment_size=reader.segments[0][2] if reader.version >= VERSION_SEGMENTED and reader.segments else 0,
+                         checksums=reader.version == VERSION_CHECKED, streaming=True)
+    start_time = time.time()
+
+    def add_compressed(webp_data):
+        writer.add_frame(webp_data)
+        if progress_callback:
+            elapsed = time.time() - start_time
+            remaining = reader.frame_count - writer.frame_count
+            progress_callback(writer.frame_count, reader.frame_count, elapsed, remaining * elapsed / writer.frame_count)
+
+    source_bytes = reader.width * reader.height * 3
+    target_bytes = width * height * 3
+    pipeline = Pipeline("transcode", max_memory=max_memory)
+    pipeline.source("read", (frame_data for index in range(len(reader.segments)) for frame_data in reader.read_segment(index)),
+                    item_bytes=source_bytes // WEBP_SIZE_RATIO)
+    pipeline.stage("transcode", lambda frame_data: _transcode_frame(frame_data, width, height, quality),
+                   workers=workers or os.cpu_count() or 1, executor=executor,
+                   item_bytes=target_bytes // WEBP_SIZE_RATIO, work_bytes=source_bytes + 2 * target_bytes)
+
+    print(f"🔁 Transcoding {input_path}: {reader.width}x{reader.height} -> {width}x{height} (q={quality})...")
+    try:
+        pipeline.run(add_compressed)
+        if max_memory:
+            print(pipeline.report())
+
+        reader.read_audio()
+        if reader.audio_data:
+            writer.set_audio(reader.audio_data, codec=reader.audio_codec)
+        writer.write()
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.frame_count
+
+def _extract_segment(reader, index, temp_dir):
+    _, first, count = reader.segments[index]
+    for i, frame_data in enumerate(reader.read_segment(index), start=first):
+        with open(os.path.join(temp_dir, f"frame_{i:04d}.webp"), 'wb') as f:
+            f.write(frame_data)
+    return count
+
+# mpgif_to_video's progress counts each frame once per pass: extracted, then encoded by FFmpeg.
+DECODE_PROGRESS_PASSES = 2
+
+def mpgif_to_video(input_path, output_path, workers=None, progress_callback=None):
     """
     Converts .mpgif back to MP4 (h264/aac).
+    Segments are extracted concurrently (segmented files fan out across workers).
+    progress_callback(current, total, elapsed, eta) counts each frame twice, once extracted
+    and once encoded by FFmpeg (read from its -progress output), over
+    total = DECODE_PROGRESS_PASSES x frame count.
     """
+    import time
     reader = MPGIFReader(input_path)
-    reader.read()
+    reader.read_index()
     
     temp_dir = tempfile.mkdtemp()
     try:
-        frame_paths = []
-        print(f"📂 Extracting {len(reader.frames)} frames...")
-        for i, frame_data in enumerate(reader.frames):
-            frame_path = os.path.join(temp_dir, f"frame_{i:04d}.webp")
-            with open(frame_path, 'wb') as f:
-                f.write(frame_data)
-            frame_paths.append(frame_path)
+        print(f"📂 Extracting {reader.frame_count} frames ({len(reader.segments)} segments)...")
+        workers = workers or min(len(reader.segments), os.cpu_count() or 1) or 1
+        start_time = time.time()
+        total = DECODE_PROGRESS_PASSES * reader.frame_count
+        def report(current):
+            if progress_callback and current > 0:
+                elapsed = time.time() - start_time
+                progress_callback(current, total, elapsed, (total - current) * elapsed / current)
+
+        extracted = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for count in pool.map(lambda index: _extract_segment(reader, index, temp_dir), range(len(reader.segments))):
+                extracted += count
+                report(extracted)
             
         audio_path = None
+        reader.read_audio()
         if reader.audio_data and len(reader.audio_data) > 0:
             print("🎵 Extracting Audio...")
             ext = ".mp3" if reader.audio_codec == CODEC_MP3 else ".opus"
@@ -120,6 +321,7 @@ def mpgif_to_video(input_path, output_path):
         
         cmd = [
             get_ffmpeg_cmd(), '-y',
+            '-nostats', '-progress', 'pipe:1',
             '-framerate', str(reader.fps), 
             '-i', frames_pattern,
         ]
@@ -138,7 +340,7 @@ def mpgif_to_video(input_path, output_path):
         cmd.append(output_path)
         
         try:
-            subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+            _run_ffmpeg_progress(cmd, lambda frame: report(extracted + min(frame, reader.frame_count)))
             print(f"✨ Restored video: {output_path}")
         except subprocess.CalledProcessError as e:
             print(f"❌ FFmpeg Muxing Failed!")
@@ -151,3 +353,237 @@ def mpgif_to_video(input_path, output_path):
 
     finally:
         shutil.rmtree(temp_dir)
+
+def _run_ffmpeg_progress(cmd, on_frame):
+    """
+    Runs an FFmpeg command started with -progress pipe:1, calling on_frame(frames encoded)
+    on each progress report. Raises CalledProcessError (with stderr) on failure.
+    """
+    import threading
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stderr = []
+    stderr_thread = threading.Thread(target=lambda: stderr.append(proc.stderr.read()), daemon=True)
+    stderr_thread.start()
+    try:
+        for line in proc.stdout:
+            key, _, value = line.decode('ascii', 'replace').strip().partition('=')
+            if key == 'frame' and value.isdigit():
+                on_frame(int(value))
+    finally:
+        proc.stdout.close()
+        proc.wait()
+        stderr_thread.join()
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr[0] if stderr else b'')
+
+class _RawVideoLog:
+    """
+    Reads the log (stderr) of an FFmpeg process writing rawvideo, in a thread of its own.
+    The output size is only known once FFmpeg has opened its input: wait_size() blocks until
+    it is read from the log, and returns (width, height), or None if FFmpeg ended before.
+    """
+    def __init__(self, proc):
+        import threading
+        self.proc = proc
+        self.lines = []
+        self.size = None
+        self._size_known = threading.Event()
+        self.thread = threading.Thread(target=self._read, daemon=True)
+        self.thread.start()
+
+    def _read(self):
+        import re
+        output_seen = False
+        for line in self.proc.stderr:
+            line = line.decode('utf-8', 'replace')
+            self.lines.append(line)
+            output_seen = output_seen or line.startswith("Output #0")
+            match = re.search(r"rawvideo.*?, (\d+)x(\d+)", line) if output_seen and self.size is None else None
+            if match:
+                self.size = tuple(int(value) for value in match.groups())
+                self._size_known.set()
+        self._size_known.set()
+
+    def wait_size(self):
+        self._size_known.wait()
+        return self.size
+
+    def text(self, last=None):
+        return ''.join(self.lines[-last:] if last else self.lines)
+
+def _feed_processes(stream, procs, chunk_size=1 << 16):
+    """Copies a binary stream to the stdin of several processes (one that exits is dropped)."""
+    try:
+        while procs:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            for proc in list(procs):
+                try:
+                    proc.stdin.write(chunk)
+                except OSError:
+                    procs.remove(proc)
+    finally:
+        for proc in procs:
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+
+def video_stream_to_mpgif(input_stream, output_path, target_fps=15, width=480, height=None, quality=75, loop=0,
+                          progress_callback=None, segment_size=0, checksums=False, executor=None):
+    """
+    Converts a video read from a binary stream (e.g. sys.stdin.buffer) to .mpgif, without temporary files.
+    The stream is fed to two FFmpeg processes: one resamples the video to raw RGB frames, the other
+    compresses the audio track to MP3 (a video without audio just gives no audio block).
+    output_path may also be a binary stream (e.g. sys.stdout.buffer).
+    Returns the number of frames written.
+    """
+    import threading
+    import numpy as np
+
+    ffmpeg = get_ffmpeg_cmd()
+    scale = f"scale={width}:{height}" if height else f"scale={width}:trunc(ih*{width}/iw)"
+    video_proc = subprocess.Popen(
+        [ffmpeg, '-hide_banner', '-nostats', '-i', 'pipe:0', '-map', '0:v:0',
+         '-vf', f'fps={target_fps},{scale}', '-f', 'rawvideo', '-pix_fmt', 'rgb24', 'pipe:1'],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    audio_proc = subprocess.Popen(
+        [ffmpeg, '-v', 'error', '-i', 'pipe:0', '-map', '0:a:0', '-c:a', 'libmp3lame', '-q:a', '4', '-f', 'mp3', 'pipe:1'],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+    log = _RawVideoLog(video_proc)
+    audio_chunks = []
+    audio_thread = threading.Thread(target=lambda: audio_chunks.append(audio_proc.stdout.read()), daemon=True)
+    threading.Thread(target=_feed_processes, args=(input_stream, [video_proc, audio_proc]), daemon=True).start()
+    audio_thread.start()
+
+    encoder = None
+    try:
+        size = log.wait_size()
+        if not size:
+            video_proc.wait()
+            raise RuntimeError(f"FFmpeg decoding failed ({video_proc.returncode}): {log.text()}")
+        width, height = size
+        frame_size = width * height * 3
+        print(f"🔄 Processing stream ({width}x{height} @ {target_fps}fps)...")
+
+        encoder = MPGIFEncoder(output_path, width, height, target_fps, quality=quality, loop=loop,
+                               segment_size=segment_size, checksums=checksums, executor=executor,
+                               progress_callback=progress_callback)
+        while True:
+            data = video_proc.stdout.read(frame_size)
+            if len(data) < frame_size:
+                break
+            encoder.add_frame(np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3))
+
+        if video_proc.wait() != 0:
+            log.thread.join()
+            raise RuntimeError(f"FFmpeg decoding failed ({video_proc.returncode}): {log.text()}")
+        audio_thread.join()
+        if audio_proc.wait() == 0 and audio_chunks and audio_chunks[0]:
+            encoder.set_audio(audio_chunks[0], codec=CODEC_MP3)
+        saved_count = encoder.close()
+        print(f"✨ Conversion completed : {encoder.writer.name} ({saved_count} frames)")
+        return saved_count
+    except BaseException:
+        if encoder is not None:
+            encoder.abort()
+        raise
+    finally:
+        for proc in (video_proc, audio_proc):
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+
+def _decode_rgb(frame_data):
+    from PIL import Image
+    return Image.open(io.BytesIO(frame_data)).convert("RGB").tobytes()
+
+def _write_pipe(fd, data):
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+    except BrokenPipeError:
+        pass
+
+def mpgif_to_video_stream(input_path, output_path, executor=None, max_memory=None, workers=None):
+    """
+    Converts .mpgif to MP4 (h264/aac) without temporary frames: frames are decoded in `executor`
+    (or a pool of its own) on `workers` threads (default: CPU count) and piped to FFmpeg as
+    raw RGB; the audio is given on a second pipe.
+    input_path may be a binary stream (e.g. sys.stdin.buffer); a non-seekable one is read completely
+    first (still compressed), since the audio block comes after the frames.
+    output_path may be a binary stream with a file descriptor (e.g. sys.stdout.buffer): the MP4 is
+    then fragmented, so that it can be written without seeking.
+    Reading, decoding and piping run as a Pipeline; max_memory (bytes) bounds the raw frames
+    held between the stages (and prints the stage metrics).
+    """
+    import threading
+    reader = MPGIFReader(input_path)
+    if isinstance(input_path, (str, os.PathLike)) or input_path.seekable():
+        reader.read_index()
+        reader.read_audio()
+        segments = (reader.read_segment(index) for index in range(len(reader.segments)))
+    else:
+        reader.read()
+        segments = [reader.frames]
+
+    audio_path = None
+    pass_fds = ()
+    cmd = [get_ffmpeg_cmd(), '-y', '-v', 'error',
+           '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f'{reader.width}x{reader.height}',
+           '-framerate', str(reader.fps), '-i', 'pipe:0']
+    if reader.audio_data:
+        if os.name == 'posix':
+            audio_read, audio_write = os.pipe()
+            pass_fds = (audio_read,)
+            cmd.extend(['-i', f'pipe:{audio_read}'])
+        else:
+            fd, audio_path = tempfile.mkstemp(suffix=".mp3" if reader.audio_codec == CODEC_MP3 else ".opus")
+            with os.fdopen(fd, 'wb') as f:
+                f.write(reader.audio_data)
+            cmd.extend(['-i', audio_path])
+    cmd.extend(['-c:v', 'libx264', '-pix_fmt', 'yuv420p'])
+    if reader.audio_data:
+        cmd.extend(['-c:a', 'aac', '-b:a', '128k'])
+    if isinstance(output_path, (str, os.PathLike)):
+        cmd.append(output_path)
+        stdout = subprocess.DEVNULL
+    else:
+        cmd.extend(['-movflags', 'frag_keyframe+empty_moov', '-f', 'mp4', 'pipe:1'])
+        output_path.flush()
+        stdout = output_path
+
+    print(f"🎥 Muxing {reader.frame_count} frames to video (pipe)...")
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=stdout, stderr=subprocess.PIPE, pass_fds=pass_fds)
+    audio_thread = None
+    if pass_fds:
+        os.close(audio_read)
+        audio_thread = threading.Thread(target=_write_pipe, args=(audio_write, reader.audio_data), daemon=True)
+        audio_thread.start()
+    frame_bytes = reader.width * reader.height * 3
+    pipeline = Pipeline("decode", max_memory=max_memory)
+    pipeline.source("read", (frame_data for frames in segments for frame_data in frames), item_bytes=frame_bytes // WEBP_SIZE_RATIO)
+    pipeline.stage("decode", _decode_rgb, workers=workers or os.cpu_count() or 1, executor=executor,
+                   item_bytes=frame_bytes, work_bytes=2 * frame_bytes)
+    try:
+        try:
+            pipeline.run(proc.stdin.write, name="mux")
+            proc.stdin.close()
+            if max_memory:
+                print(pipeline.report())
+        except BrokenPipeError:
+            pass
+        stderr = proc.stderr.read()
+        if proc.wait() != 0:
+            raise RuntimeError(f"FFmpeg muxing failed ({proc.returncode}): {stderr.decode('utf-8', 'replace')}")
+        print(f"✨ Restored video: {getattr(output_path, 'name', output_path)}")
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        if audio_thread is not None:
+            audio_thread.join()
+        if audio_path:
+            os.remove(audio_path)
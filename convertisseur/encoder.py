@@ -0,0 +1,125 @@
+import asyncio
+import os
+import time
+from collections import deque
+from fichier.mpgif_structure import MPGIFWriter, CODEC_MP3
+from compresseur.multimedia_utils import compress_frame_webp, compress_array_webp, compress_pcm_mp3, resize_into
+
+class MPGIFEncoder:
+    """
+    Builds a .mpgif from frames produced in memory (no intermediate video file).
+
+    Frames are NumPy arrays (H x W x 3, uint8, RGB by default or BGR with channel_order="BGR")
+    or PIL Images; they are resized to width x height if needed and compressed to WebP,
+    in `executor` when given (a bounded number in flight, order kept), and streamed into
+    an MPGIFWriter. Audio is given as compressed bytes (set_audio) or raw PCM (set_pcm_audio).
+
+        with MPGIFEncoder("out.mpgif", 480, 270, fps=15, executor=pool) as encoder:
+            encoder.encode(frames)
+            encoder.set_pcm_audio(pcm, sample_rate=44100, channels=2)
+    """
+    def __init__(self, output_path, width, height, fps, quality=75, loop=0, segment_size=0, checksums=False,
+                 executor=None, max_pending=None, channel_order="RGB", progress_callback=None, total_frames=None):
+        self.output_path = output_path
+        self.width = width
+        self.height = height
+        self.quality = quality
+        self.executor = executor
+        self.max_pending = max_pending or (os.cpu_count() or 1) * 2
+        self.channel_order = channel_order
+        self.progress_callback = progress_callback
+        self.total_frames = total_frames
+        self.writer = MPGIFWriter(output_path, width, height, fps, loop, segment_size=segment_size,
+                                  checksums=checksums, streaming=True)
+        self.pending = deque()
+        self.start_time = time.time()
+
+    @property
+    def frame_count(self):
+        return self.writer.frame_count
+
+    def compress(self, frame):
+        """Compresses one frame to WebP bytes (runs in the executor)."""
+        if hasattr(frame, "shape"):
+            if frame.ndim == 3 and frame.shape[2] == 4:
+                frame = frame[:, :, :3]
+            return compress_array_webp(resize_into(frame, self.width, self.height),
+                                       quality=self.quality, channel_order=self.channel_order)
+        if frame.size != (self.width, self.height):
+            frame = frame.resize((self.width, self.height))
+        return compress_frame_webp(frame, quality=self.quality)
+
+    def add_compressed(self, webp_data):
+        """Adds a frame already compressed with compress() (in order)."""
+        self.writer.add_frame(webp_data)
+        if self.progress_callback:
+            saved_count = self.writer.frame_count
+            total = max(self.total_frames or saved_count, saved_count)
+            elapsed = time.time() - self.start_time
+            self.progress_callback(saved_count, total, elapsed, (total - saved_count) * elapsed / saved_count)
+
+    def add_frame(self, frame):
+        if self.executor is None:
+            self.add_compressed(self.compress(frame))
+            return
+        self.pending.append(self.executor.submit(self.compress, frame))
+        if len(self.pending) >= self.max_pending:
+            self.add_compressed(self.pending.popleft().result())
+
+    def encode(self, frames):
+        """Adds every frame of an iterable."""
+        for frame in frames:
+            self.add_frame(frame)
+
+    async def encode_async(self, frames):
+        """Adds every frame of an async iterable (or iterable), compressing in the executor."""
+        loop = asyncio.get_running_loop()
+        pending = deque()
+        try:
+            if hasattr(frames, "__aiter__"):
+                async for frame in frames:
+                    pending.append(loop.run_in_executor(self.executor, self.compress, frame))
+                    if len(pending) >= self.max_pending:
+                        self.add_compressed(await pending.popleft())
+            else:
+                for frame in frames:
+                    pending.append(loop.run_in_executor(self.executor, self.compress, frame))
+                    if len(pending) >= self.max_pending:
+                        self.add_compressed(await pending.popleft())
+            while pending:
+                self.add_compressed(await pending.popleft())
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def set_audio(self, audio_data, codec=CODEC_MP3):
+        """Sets an already compressed audio track (MP3 by default)."""
+        self.writer.set_audio(audio_data, codec=codec)
+
+    def set_pcm_audio(self, pcm_data, sample_rate=44100, channels=2):
+        """Compresses raw s16le PCM (bytes or int16 array) to MP3 and sets it as the audio track."""
+        self.writer.set_audio(compress_pcm_mp3(pcm_data, sample_rate, channels), codec=CODEC_MP3)
+
+    def close(self):
+        """Waits for the frames in flight and finalizes the file. Returns the frame count."""
+        while self.pending:
+            self.add_compressed(self.pending.popleft().result())
+        self.writer.write()
+        return self.writer.frame_count
+
+    def abort(self):
+        """Drops the frames in flight and removes the partial file."""
+        for future in self.pending:
+            future.cancel()
+        self.pending.clear()
+        self.writer.abort()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
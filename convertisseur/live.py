@@ -0,0 +1,257 @@
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from fichier.mpgif_structure import MPGIFWriter, CODEC_MP3, DEFAULT_SEGMENT_SIZE
+from compresseur.multimedia_utils import compress_array_webp, get_ffmpeg_cmd
+from convertisseur.converter import _RawVideoLog, _feed_processes
+
+class LiveStats:
+    """
+    Counters of a live recording (end-to-end latency: frame out of FFmpeg -> frame written).
+    captured and dropped are counted by the capture thread and the main loop, through add().
+    """
+    def __init__(self):
+        self.start_time = time.monotonic()
+        self.captured = 0
+        self.written = 0
+        self.dropped = 0
+        self.queue_depth = 0
+        self.latencies = deque(maxlen=1000)  # ms, most recent frames
+        self.lock = threading.Lock()
+
+    def add(self, captured=0, dropped=0):
+        with self.lock:
+            self.captured += captured
+            self.dropped += dropped
+
+    def latency(self, fraction):
+        if not self.latencies:
+            return 0.0
+        values = sorted(self.latencies)
+        return values[min(len(values) - 1, int(fraction * len(values)))]
+
+    def as_dict(self):
+        return {"elapsed": round(time.monotonic() - self.start_time, 3), "captured": self.captured,
+                "written": self.written, "dropped": self.dropped, "queue_depth": self.queue_depth,
+                "latency_p50_ms": round(self.latency(0.5), 1), "latency_p95_ms": round(self.latency(0.95), 1),
+                "latency_max_ms": round(max(self.latencies, default=0.0), 1)}
+
+    def __str__(self):
+        return (f"🔴 {time.monotonic() - self.start_time:6.1f}s | {self.written} frames | "
+                f"{self.dropped} dropped | latency {self.latency(0.5):.0f} ms (p95 {self.latency(0.95):.0f}) | "
+                f"queue {self.queue_depth}")
+
+def live_source_args(source, input_format=None, realtime=False, duration=None):
+    """
+    FFmpeg input arguments for a live source: a device or URL, "-" for stdin, or
+    "lavfi:testsrc=size=640x360:rate=30" style shortcuts (input_format "lavfi").
+    realtime reads files and generated sources at their native rate (-re), as a live feed would.
+    duration (seconds) limits the input, hence every output read from it (video and audio).
+    """
+    if input_format is None and source.startswith("lavfi:"):
+        input_format, source = "lavfi", source[len("lavfi:"):]
+    args = []
+    if realtime or input_format == "lavfi":
+        args.append('-re')
+    if input_format:
+        args.extend(['-f', input_format])
+    if duration:
+        args.extend(['-t', str(duration)])
+    args.extend(['-i', 'pipe:0' if source == "-" else source])
+    return args
+
+def record_live(source, output_path, target_fps=15, width=480, height=None, quality=75, loop=0,
+                segment_size=DEFAULT_SEGMENT_SIZE, checksums=False, executor=None, input_format=None,
+                realtime=False, duration=None, audio=False, max_pending=None, max_queue=None,
+                stop_event=None, stats_callback=None, stats_interval=1.0):
+    """
+    Encodes a live video source (capture device, URL, pipe, file being written, lavfi test source)
+    to .mpgif as frames arrive, in bounded latency.
+
+    FFmpeg resamples the source to target_fps and scales it; frames are compressed in `executor`
+    with at most max_pending in flight and written in order, segment by segment (each segment is
+    on disk as soon as it is full). When compression falls behind, frames are dropped instead of
+    queued: a dropped frame is written as a repeat of the previous one, so the timing (and the
+    audio) stays in sync. The recording ends with the source, after `duration` seconds, when
+    stop_event is set, or on Ctrl+C; the file is finalized in every case.
+    audio=True also records the source's first audio track to MP3 (the source must have one).
+
+    stats_callback(stats_dict) is called every stats_interval seconds and at the end.
+    Returns the final LiveStats.
+    """
+    import numpy as np
+
+    segment_size = segment_size or DEFAULT_SEGMENT_SIZE
+    max_pending = max_pending or (os.cpu_count() or 1) * 2
+    max_queue = max_queue or max_pending
+    own_executor = executor is None
+    if own_executor:
+        from concurrent.futures import ThreadPoolExecutor
+        executor = ThreadPoolExecutor()
+
+    scale = f"scale={width}:{height}" if height else f"scale={width}:trunc(ih*{width}/iw)"
+    cmd = [get_ffmpeg_cmd(), '-hide_banner', '-nostats'] + live_source_args(source, input_format, realtime, duration)
+    cmd.extend(['-map', '0:v:0', '-vf', f'fps={target_fps},{scale}', '-f', 'rawvideo', '-pix_fmt', 'rgb24', 'pipe:1'])
+
+    # The audio is a second output of the same FFmpeg process (a device can only be opened once):
+    # a pipe on POSIX, a temporary file elsewhere.
+    audio_chunks = []
+    audio_read_fd = audio_temp = None
+    popen_args = {}
+    if audio:
+        if os.name == 'posix':
+            audio_read_fd, audio_write_fd = os.pipe()
+            audio_target = f'pipe:{audio_write_fd}'
+            popen_args['pass_fds'] = (audio_write_fd,)
+        else:
+            audio_temp = tempfile.NamedTemporaryFile(suffix=".mp3", delete=False)
+            audio_temp.close()
+            audio_target = audio_temp.name
+        cmd.extend(['-map', '0:a:0', '-c:a', 'libmp3lame', '-q:a', '4', '-f', 'mp3', '-y', audio_target])
+
+    stdin = subprocess.PIPE if source == "-" else subprocess.DEVNULL
+    proc = subprocess.Popen(cmd, stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **popen_args)
+    if audio and audio_read_fd is not None:
+        os.close(audio_write_fd)
+        threading.Thread(target=lambda: audio_chunks.append(_read_all(audio_read_fd)), daemon=True).start()
+    if source == "-":
+        threading.Thread(target=_feed_processes, args=(sys.stdin.buffer, [proc]), daemon=True).start()
+
+    log = _RawVideoLog(proc)
+    size = log.wait_size()
+    if not size:
+        proc.wait()
+        if own_executor:
+            executor.shutdown()
+        raise RuntimeError(f"FFmpeg cannot open the live source ({proc.returncode}): {log.text(20)}")
+    width, height = size
+    frame_size = width * height * 3
+
+    stats = LiveStats()
+    frames = queue.Queue(maxsize=max_queue)
+    stop = stop_event or threading.Event()
+
+    def capture():
+        # Reads FFmpeg's output as fast as it comes; when the queue is full the frame is dropped
+        # here and counted on the next frame that gets through.
+        skipped = 0
+        while True:
+            data = proc.stdout.read(frame_size)
+            if len(data) < frame_size:
+                break
+            try:
+                frames.put_nowait((time.monotonic(), data, skipped))
+                skipped = 0
+                stats.add(captured=1)
+            except queue.Full:
+                skipped += 1
+                stats.add(captured=1, dropped=1)
+        frames.put((None, None, skipped))
+
+    writer = MPGIFWriter(output_path, width, height, target_fps, loop, segment_size=segment_size,
+                         checksums=checksums, streaming=True)
+    pending = deque()   # futures in order; None for a dropped frame (repeat of the previous one)
+    last_frame = [None]
+    next_report = time.monotonic() + stats_interval
+
+    def compress(data):
+        array = np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3)
+        return compress_array_webp(array, quality=quality, channel_order="RGB")
+
+    def write_ready(block):
+        # Writes the frames that are done, in order; with block=True waits for all of them.
+        segments = len(writer.segments)
+        while pending and (block or pending[0][1] is None or pending[0][1].done()):
+            arrival, future = pending.popleft()
+            if future is not None:
+                last_frame[0] = future.result()
+            writer.add_frame(last_frame[0])
+            stats.written += 1
+            stats.latencies.append((time.monotonic() - arrival) * 1000)
+        if len(writer.segments) != segments:
+            writer.flush()
+
+    threading.Thread(target=capture, daemon=True).start()
+    print(f"🔴 Recording {source} -> {writer.name} ({width}x{height} @ {target_fps}fps, Ctrl+C to stop)...")
+    try:
+        try:
+            while True:
+                if stop.is_set() and proc.poll() is None:
+                    proc.terminate()
+                try:
+                    arrival, data, skipped = frames.get(timeout=0.1)
+                except queue.Empty:
+                    write_ready(False)
+                    continue
+                stats.queue_depth = frames.qsize()
+                for _ in range(skipped):
+                    if pending or last_frame[0] is not None:
+                        pending.append((arrival, None))
+                if data is None:
+                    break
+                in_flight = sum(1 for _, future in pending if future is not None and not future.done())
+                if in_flight >= max_pending and (pending or last_frame[0] is not None):
+                    # Behind: drop rather than wait, the capture side must not back up.
+                    pending.append((arrival, None))
+                    stats.add(dropped=1)
+                else:
+                    pending.append((arrival, executor.submit(compress, data)))
+                write_ready(False)
+
+                now = time.monotonic()
+                if now >= next_report:
+                    next_report = now + stats_interval
+                    if stats_callback:
+                        stats_callback(stats.as_dict())
+                    else:
+                        print(f"\r{stats}", end="", flush=True)
+        except KeyboardInterrupt:
+            print("\n⏹️ Stop requested, finalizing...")
+            if proc.poll() is None:
+                proc.terminate()
+
+        write_ready(True)
+        if proc.wait() != 0 and not stats.written:
+            raise RuntimeError(f"FFmpeg capture failed ({proc.returncode}): {log.text(20)}")
+        if audio:
+            audio_data = _collect_audio(audio_chunks, audio_read_fd, audio_temp)
+            if audio_data:
+                writer.set_audio(audio_data, codec=CODEC_MP3)
+        writer.write()
+    except BaseException:
+        writer.abort()
+        raise
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+        for _, future in pending:
+            if future is not None:
+                future.cancel()
+        if own_executor:
+            executor.shutdown(cancel_futures=True)
+        if audio_temp is not None and os.path.exists(audio_temp.name):
+            os.remove(audio_temp.name)
+
+    print(f"\n✨ Recording completed : {stats}")
+    if stats_callback:
+        stats_callback(stats.as_dict())
+    return stats
+
+def _read_all(fd):
+    with os.fdopen(fd, 'rb') as f:
+        return f.read()
+
+def _collect_audio(audio_chunks, audio_read_fd, audio_temp):
+    if audio_temp is not None:
+        with open(audio_temp.name, 'rb') as f:
+            return f.read()
+    deadline = time.monotonic() + 5
+    while not audio_chunks and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return audio_chunks[0] if audio_chunks else None
@@ -0,0 +1,261 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+DEFAULT_QUEUE_FACTOR = 2     # queue capacity per consumer worker without a memory budget
+MAX_QUEUE_CAPACITY = 256
+POLL_INTERVAL = 0.1
+
+_END = object()
+
+class PipelineStopped(Exception):
+    """Raised inside the stage threads when another stage failed."""
+
+class StageMetrics:
+    """
+    Counters of one stage: items processed, time spent working (busy), waiting for input
+    (starved: the stage before is slower) and waiting for room in its output queue
+    (stalled: the stage after is slower), and the occupancy of its output queue.
+    """
+    def __init__(self, name, workers, capacity):
+        self.name = name
+        self.workers = workers
+        self.capacity = capacity
+        self.processed = 0
+        self.busy = 0.0
+        self.starved = 0.0
+        self.stalled = 0.0
+        self.occupancy_total = 0
+        self.occupancy_samples = 0
+        self.occupancy_max = 0
+        self.lock = threading.Lock()
+
+    def add_busy(self, seconds):
+        with self.lock:
+            self.busy += seconds
+            self.processed += 1
+
+    def sample(self, size):
+        self.occupancy_total += size
+        self.occupancy_samples += 1
+        self.occupancy_max = max(self.occupancy_max, size)
+
+    def as_dict(self, elapsed):
+        return {"stage": self.name, "workers": self.workers, "capacity": self.capacity,
+                "processed": self.processed, "busy_s": round(self.busy, 3),
+                "utilization": round(self.busy / (elapsed * self.workers), 3) if elapsed else 0.0,
+                "starved_s": round(self.starved, 3), "stalled_s": round(self.stalled, 3),
+                "occupancy_mean": round(self.occupancy_total / self.occupancy_samples, 2) if self.occupancy_samples else 0.0,
+                "occupancy_max": self.occupancy_max}
+
+class _Stage:
+    def __init__(self, name, function, workers, executor, item_bytes, work_bytes):
+        self.name = name
+        self.function = function
+        self.workers = max(1, workers)
+        self.executor = executor
+        self.item_bytes = item_bytes
+        self.work_bytes = work_bytes
+        self.output = None
+        self.metrics = None
+
+    @property
+    def pooled(self):
+        return self.executor is not None or self.workers > 1
+
+class Pipeline:
+    """
+    Staged pipeline with bounded queues between the stages (backpressure), e.g.
+
+        decode (source) -> transform -> compress (pooled) -> write (sink)
+
+    The source iterable is consumed in its own thread, each stage runs in its own thread,
+    pooled stages (workers > 1 or an executor) submit items to a thread pool, order kept,
+    and the sink runs in the calling thread. A full queue blocks the stage before it, so
+    at most a fixed number of items exists at any time.
+
+    max_memory (bytes) sizes the queues and pools from the per-item estimates given to
+    source()/stage(): item_bytes is the size of an item a stage outputs, work_bytes the
+    memory held while processing one. The budget is shared equally by the queues. An entry
+    of a pooled stage's queue is a future that may be waiting, running or done, so it counts
+    its input, its working memory and its output; the pool gets no more threads than can
+    be in flight through its queue. A budget too small for one item per queue is exceeded, with
+    a warning: every queue holds at least one item. Without a budget, each queue holds
+    DEFAULT_QUEUE_FACTOR items per worker around it.
+
+    run() returns the metrics of every stage (see StageMetrics); an exception in any
+    stage stops the others and is raised again by run().
+    """
+    def __init__(self, name, max_memory=None):
+        self.name = name
+        self.max_memory = max_memory
+        self.stages = []
+        self.iterable = None
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._error = None
+
+    def source(self, name, iterable, item_bytes=0):
+        self.iterable = iterable
+        self.stages.insert(0, _Stage(name, None, 1, None, item_bytes, 0))
+        return self
+
+    def stage(self, name, function, workers=1, executor=None, item_bytes=0, work_bytes=0):
+        """Adds a stage run by `workers` threads: a pool of its own, or `executor` (workers is then its size)."""
+        self.stages.append(_Stage(name, function, workers, executor, item_bytes, work_bytes))
+        return self
+
+    def _queue_cost(self, index):
+        stage = self.stages[index]
+        cost = stage.item_bytes
+        if stage.pooled:
+            cost += self.stages[index - 1].item_bytes + stage.work_bytes
+        return max(1, cost)
+
+    def _plan(self, sink_name):
+        if self.max_memory:
+            # Single-threaded stages hold one item while working on it.
+            fixed = sum(stage.work_bytes for stage in self.stages if not stage.pooled)
+            share = max(0, self.max_memory - fixed) / len(self.stages)
+            over = [stage.name for index, stage in enumerate(self.stages) if share < self._queue_cost(index)]
+            if over:
+                print(f"⚠️ Pipeline {self.name}: budget of {self.max_memory / (1024 * 1024):.1f} MB too small "
+                      f"for one item per queue ({', '.join(over)}), memory use will exceed it")
+        for index, stage in enumerate(self.stages):
+            if self.max_memory:
+                capacity = int(share // self._queue_cost(index))
+            else:
+                consumer_workers = self.stages[index + 1].workers if index + 1 < len(self.stages) else 1
+                capacity = DEFAULT_QUEUE_FACTOR * max(stage.workers, consumer_workers)
+            capacity = max(1, min(MAX_QUEUE_CAPACITY, capacity))
+            if stage.pooled:
+                # In flight: the queue, the future being put and the one being waited on downstream.
+                stage.workers = min(stage.workers, capacity + 2)
+            stage.output = queue.Queue(maxsize=capacity)
+            stage.metrics = StageMetrics(stage.name, stage.workers, capacity)
+        self.sink_metrics = StageMetrics(sink_name, 1, 0)
+
+    def _put(self, stage, item):
+        start = time.perf_counter()
+        while True:
+            if self._stop.is_set():
+                raise PipelineStopped()
+            try:
+                stage.output.put(item, timeout=POLL_INTERVAL)
+                break
+            except queue.Full:
+                pass
+        stage.metrics.stalled += time.perf_counter() - start
+        stage.metrics.sample(stage.output.qsize())
+
+    def _get(self, upstream, metrics):
+        start = time.perf_counter()
+        while True:
+            if self._stop.is_set():
+                raise PipelineStopped()
+            try:
+                item = upstream.output.get(timeout=POLL_INTERVAL)
+                break
+            except queue.Empty:
+                pass
+        if isinstance(item, Future):
+            item = item.result()
+        metrics.starved += time.perf_counter() - start
+        return item
+
+    def _guard(self, target, *args):
+        try:
+            target(*args)
+        except PipelineStopped:
+            pass
+        except BaseException as e:
+            if self._error is None:
+                self._error = e
+            self._stop.set()
+
+    def _run_source(self, stage):
+        iterator = iter(self.iterable)
+        while True:
+            start = time.perf_counter()
+            item = next(iterator, _END)
+            if item is _END:
+                break
+            stage.metrics.add_busy(time.perf_counter() - start)
+            self._put(stage, item)
+        self._put(stage, _END)
+
+    def _timed(self, stage, item):
+        start = time.perf_counter()
+        result = stage.function(item)
+        stage.metrics.add_busy(time.perf_counter() - start)
+        return result
+
+    def _run_stage(self, upstream, stage, pool):
+        while True:
+            item = self._get(upstream, stage.metrics)
+            if item is _END:
+                break
+            if pool is not None:
+                self._put(stage, pool.submit(self._timed, stage, item))
+            else:
+                self._put(stage, self._timed(stage, item))
+        self._put(stage, _END)
+
+    def run(self, sink, name="write"):
+        """Runs the pipeline to the end, calling sink(item) on every output item in order."""
+        self._plan(name)
+        pools = []
+        threads = [threading.Thread(target=self._guard, args=(self._run_source, self.stages[0]), daemon=True)]
+        for upstream, stage in zip(self.stages, self.stages[1:]):
+            pool = stage.executor
+            if pool is None and stage.workers > 1:
+                pool = ThreadPoolExecutor(max_workers=stage.workers)
+                pools.append(pool)
+            threads.append(threading.Thread(target=self._guard, args=(self._run_stage, upstream, stage, pool), daemon=True))
+
+        start_time = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        try:
+            last = self.stages[-1]
+            while True:
+                item = self._get(last, self.sink_metrics)
+                if item is _END:
+                    break
+                start = time.perf_counter()
+                sink(item)
+                self.sink_metrics.add_busy(time.perf_counter() - start)
+        except PipelineStopped:
+            pass
+        except BaseException as e:
+            if self._error is None:
+                self._error = e
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            for stage in self.stages:
+                while stage.output is not None and not stage.output.empty():
+                    item = stage.output.get_nowait()
+                    if isinstance(item, Future):
+                        item.cancel()
+            for pool in pools:
+                pool.shutdown(cancel_futures=True)
+            self.elapsed = time.perf_counter() - start_time
+        if self._error is not None:
+            raise self._error
+        return self.metrics()
+
+    def metrics(self):
+        return [stage.metrics.as_dict(self.elapsed) for stage in self.stages] + [self.sink_metrics.as_dict(self.elapsed)]
+
+    def report(self):
+        """Metrics as printable lines (one per stage)."""
+        lines = [f"📊 Pipeline {self.name} ({self.elapsed:.2f}s"
+                 + (f", budget {self.max_memory / (1024 * 1024):.0f} MB)" if self.max_memory else ")")]
+        for m in self.metrics():
+            lines.append(f"   {m['stage']:<10} x{m['workers']:<2} {m['processed']:>6} items | busy {m['busy_s']:7.2f}s "
+                         f"({m['utilization']:.0%}) | starved {m['starved_s']:6.2f}s | stalled {m['stalled_s']:6.2f}s | "
+                         f"queue {m['occupancy_mean']:.1f}/{m['capacity']} (max {m['occupancy_max']})")
+        return "\n".join(lines)
@@ -0,0 +1,133 @@
+import os
+from fichier.mpgif_structure import MPGIFReader, MPGIFWriter, VERSION, VERSION_CHECKED, DEFAULT_SEGMENT_SIZE, CODEC_OPUS, CODEC_AAC, CODEC_MP3
+from compresseur.multimedia_utils import trim_audio_copy, compress_audio_mp3, compress_pcm_mp3, decode_audio_pcm
+
+AUDIO_FORMATS = {CODEC_MP3: 'mp3', CODEC_OPUS: 'ogg', CODEC_AAC: 'adts'}
+
+def _load_audio_file(audio_path):
+    """Reads an audio file as a track: MP3 is copied as is, anything else is compressed to MP3."""
+    if audio_path.lower().endswith(".mp3"):
+        with open(audio_path, 'rb') as f:
+            return f.read(), CODEC_MP3
+    audio_data = compress_audio_mp3(audio_path)
+    if not audio_data:
+        raise ValueError(f"Audio illisible: {audio_path}")
+    return audio_data, CODEC_MP3
+
+def remux_mpgif(input_paths, output_path, start_frame=0, end_frame=None, loop=None, strip_audio=False, audio_path=None):
+    """
+    Builds a new .mpgif from existing ones without re-encoding any frame:
+    concatenates the inputs (same dimensions and fps), keeps frames [start_frame, end_frame)
+    of the result, optionally changes the loop count and drops or replaces the audio track.
+    WebP frames are copied byte for byte; the audio of a single input is cut with FFmpeg stream
+    copy when needed, that of several inputs is decoded, padded to the duration of each piece
+    of video and encoded again as one MP3 stream.
+    """
+    if isinstance(input_paths, str):
+        input_paths = [input_paths]
+
+    readers = []
+    for path in input_paths:
+        reader = MPGIFReader(path)
+        reader.read_index()
+        readers.append(reader)
+
+    first = readers[0]
+    for reader in readers[1:]:
+        if (reader.width, reader.height, reader.fps) != (first.width, first.height, first.fps):
+            raise ValueError(f"Incompatible file {reader.filename}: {reader.width}x{reader.height} @ {reader.fps}fps "
+                             f"(expected {first.width}x{first.height} @ {first.fps}fps)")
+
+    total_frames = sum(reader.frame_count for reader in readers)
+    end_frame = total_frames if end_frame is None else min(end_frame, total_frames)
+    if not 0 <= start_frame < end_frame:
+        raise ValueError(f"Invalid frame range [{start_frame}, {end_frame}) for {total_frames} frames")
+
+    writer = MPGIFWriter(output_path, first.width, first.height, first.fps,
+                         first.loop_count if loop is None else loop,
+                         segment_size=0 if first.version == VERSION else DEFAULT_SEGMENT_SIZE,
+                         checksums=first.version == VERSION_CHECKED,
+                         # Frames are streamed to disk, unless the output overwrites one of the inputs.
+                         streaming=os.path.abspath(output_path) not in [os.path.abspath(path) for path in input_paths])
+
+    print(f"✂️ Remuxing frames {start_frame}-{end_frame} of {total_frames}...")
+    try:
+        audio_pieces = _copy_frames(readers, writer, start_frame, end_frame, strip_audio or audio_path is not None)
+        if audio_path is not None:
+            writer.set_audio(*_load_audio_file(audio_path))
+        elif audio_pieces:
+            audio = _remux_audio(audio_pieces, whole=len(readers) == 1 and start_frame == 0 and end_frame == total_frames)
+            if audio:
+                writer.set_audio(*audio)
+        writer.write()
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.frame_count
+
+def _copy_frames(readers, writer, start_frame, end_frame, drop_audio):
+    audio_pieces = []
+    timeline = 0
+    for reader in readers:
+        keep_start = max(start_frame - timeline, 0)
+        keep_end = min(end_frame - timeline, reader.frame_count)
+        timeline += reader.frame_count
+        if keep_start >= keep_end:
+            continue
+
+        for index, (_, seg_first, seg_count) in enumerate(reader.segments):
+            if seg_first + seg_count <= keep_start or seg_first >= keep_end:
+                continue
+            frames = reader.read_segment(index)
+            for frame_data in frames[max(keep_start - seg_first, 0):keep_end - seg_first]:
+                writer.add_frame(frame_data)
+
+        if not drop_audio:
+            audio_pieces.append((reader, keep_start, keep_end))
+    return audio_pieces
+
+def _remux_audio(pieces, whole):
+    """Returns (audio_data, codec) for the kept ranges, or None if the tracks cannot be joined."""
+    for reader, _, _ in pieces:
+        reader.read_audio()
+
+    codecs = {reader.audio_codec if reader.audio_data else None for reader, _, _ in pieces}
+    if codecs == {None}:
+        return None
+    if len(codecs) != 1:
+        print("⚠️ Pistes audio absentes ou de codecs différents : audio supprimé.")
+        return None
+    codec = codecs.pop()
+
+    if whole:
+        return pieces[0][0].audio_data, codec
+
+    audio_format = AUDIO_FORMATS[codec]
+    if len(pieces) == 1:
+        reader, keep_start, keep_end = pieces[0]
+        return trim_audio_copy(reader.audio_data, audio_format, keep_start / reader.fps,
+                               (keep_end - keep_start) / reader.fps), codec
+
+    # Joined stream-copied pieces would keep each piece's ID3/Xing headers mid-stream, and a
+    # track shorter than its video would shift the audio of the following pieces: every piece
+    # is decoded and padded to its video duration, then the whole is encoded once.
+    pcm = bytearray()
+    for reader, keep_start, keep_end in pieces:
+        pcm += decode_audio_pcm(reader.audio_data, audio_format, keep_start / reader.fps,
+                                (keep_end - keep_start) / reader.fps)
+    return compress_pcm_mp3(pcm), CODEC_MP3
+
+def trim_mpgif(input_path, output_path, start_frame, end_frame=None):
+    return remux_mpgif([input_path], output_path, start_frame=start_frame, end_frame=end_frame)
+
+def concat_mpgif(input_paths, output_path):
+    return remux_mpgif(input_paths, output_path)
+
+def set_loop_count(input_path, output_path, loop):
+    return remux_mpgif([input_path], output_path, loop=loop)
+
+def strip_audio(input_path, output_path):
+    return remux_mpgif([input_path], output_path, strip_audio=True)
+
+def replace_audio(input_path, output_path, audio_path):
+    return remux_mpgif([input_path], output_path, audio_path=audio_path)
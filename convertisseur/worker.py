@@ -0,0 +1,147 @@
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fichier.verification import verify_file
+
+DEFAULT_SOCKET = os.path.join(os.path.expanduser("~"), ".mpgif-worker.sock")
+
+class EncodeWorker:
+    """
+    Long-lived job runner: heavy modules are imported, FFmpeg is resolved and the
+    compression pool is started once, then reused by every job.
+
+    A job is a dict {"id": ..., "command": "encode" | "decode" | "verify" | "ping", "args": {...}};
+    the answer is {"id": ..., "ok": bool, "result" | "error": ..., "metrics": {...}}.
+    """
+    def __init__(self, workers=None, webp_backend=None):
+        # Imported here rather than at module level so that submit_job() clients stay light.
+        # The converter imports OpenCV, NumPy and Pillow lazily: they are warmed here so that
+        # the first job does not pay for them.
+        import cv2
+        import numpy
+        from PIL import Image
+        from compresseur.multimedia_utils import get_ffmpeg_cmd, set_webp_backend
+        from convertisseur import converter
+        if webp_backend:
+            set_webp_backend(webp_backend)
+        self.converter = converter
+        self.ffmpeg = get_ffmpeg_cmd()
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ThreadPoolExecutor(max_workers=self.workers)
+        self.jobs_done = 0
+        self.lock = threading.Lock()
+
+    def run_job(self, job):
+        command = job.get("command")
+        args = dict(job.get("args", {}))
+        start = time.perf_counter()
+        try:
+            if command == "encode":
+                input_path = args.pop("input")
+                output_path = args.pop("output")
+                cache_max_bytes = args.pop("cache_max_bytes", None)
+                cache_frames = args.pop("cache_frames", True)
+                if args.get("cache"):
+                    from convertisseur.cache import SourceCache, DEFAULT_MAX_BYTES
+                    args["cache"] = SourceCache(args["cache"], store_frames=cache_frames,
+                                                max_bytes=DEFAULT_MAX_BYTES if cache_max_bytes is None else cache_max_bytes)
+                frames = self.converter.video_to_mpgif(input_path, output_path, executor=self.pool, workers=self.workers, **args)
+                files = [output_path]
+                if args.get("renditions"):
+                    files = [r.get("output") or self.converter.rendition_output_path(output_path, r["width"], r.get("quality", args.get("quality", 75)))
+                             for r in args["renditions"]]
+                result = {"output": output_path, "files": files, "frames": frames,
+                          "output_bytes": sum(os.path.getsize(path) for path in files)}
+            elif command == "decode":
+                if args.get("max_memory"):
+                    self.converter.mpgif_to_video_stream(args["input"], args["output"], executor=self.pool,
+                                                         max_memory=args["max_memory"], workers=self.workers)
+                else:
+                    self.converter.mpgif_to_video(args["input"], args["output"])
+                result = {"output": args["output"], "output_bytes": os.path.getsize(args["output"])}
+            elif command == "verify":
+                result = {"error": verify_file(args["input"], deep=args.get("deep", False))}
+            elif command == "ping":
+                result = {"ffmpeg": self.ffmpeg, "jobs_done": self.jobs_done}
+            else:
+                raise ValueError(f"Unknown command: {command}")
+            response = {"ok": True, "result": result}
+        except Exception as e:
+            response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+        with self.lock:
+            self.jobs_done += 1
+        response["id"] = job.get("id")
+        response["metrics"] = {"seconds": round(time.perf_counter() - start, 4)}
+        return response
+
+    def run_line(self, line):
+        try:
+            job = json.loads(line)
+        except ValueError as e:
+            return {"id": None, "ok": False, "error": f"Invalid JSON: {e}"}
+        return self.run_job(job)
+
+    def close(self):
+        self.pool.shutdown()
+
+def serve_stdio(worker, stdin=None, stdout=None):
+    """
+    Reads jobs as JSON lines on stdin and writes one JSON line per answer on stdout.
+    Jobs run concurrently; answers come in completion order (match them by "id").
+    Log output is redirected to stderr so that stdout only carries answers.
+    """
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    sys.stdout = sys.stderr
+    write_lock = threading.Lock()
+
+    def answer(line):
+        response = worker.run_line(line)
+        with write_lock:
+            stdout.write(json.dumps(response) + "\n")
+            stdout.flush()
+
+    with ThreadPoolExecutor(max_workers=worker.workers) as jobs:
+        for line in stdin:
+            if line.strip():
+                jobs.submit(answer, line)
+
+class _JobHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = self.server.worker.run_line(line)
+            self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+class _WorkerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def serve_socket(worker, path=DEFAULT_SOCKET):
+    """Accepts JSON-line jobs on a local Unix socket (one thread per client connection)."""
+    if os.path.exists(path):
+        os.remove(path)
+    server = _WorkerServer(path, _JobHandler)
+    server.worker = worker
+    print(f"🛠️ Worker listening on {path}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.remove(path)
+
+def submit_job(job, path=DEFAULT_SOCKET):
+    """Thin client: sends one job to a running worker and waits for its answer."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        sock.sendall((json.dumps(job) + "\n").encode("utf-8"))
+        with sock.makefile("rb") as f:
+            return json.loads(f.readline())
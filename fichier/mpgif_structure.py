@@ -1,31 +1,90 @@
+import bisect
+import contextlib
+import io
+import mmap
 import struct
 import os
+import zlib
 
 SIGNATURE = b'MPGIF'
 VERSION = 1
+VERSION_SEGMENTED = 2
+VERSION_CHECKED = 3
+SUPPORTED_VERSIONS = (VERSION, VERSION_SEGMENTED, VERSION_CHECKED)
 HEADER_FORMAT = '>5sBHHBIB'
 HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
 FRAME_HEADER_FORMAT = '>I'
+FRAME_HEADER_SIZE = struct.calcsize(FRAME_HEADER_FORMAT)
 AUDIO_HEADER_FORMAT = '>BI'
 
+# VERSION_CHECKED uses the segmented layout with a CRC32 after each frame/audio length.
+FRAME_HEADER_CHECKED_FORMAT = '>II'
+FRAME_HEADER_CHECKED_SIZE = struct.calcsize(FRAME_HEADER_CHECKED_FORMAT)
+AUDIO_HEADER_CHECKED_FORMAT = '>BII'
+
+# Segmented layout (VERSION_SEGMENTED) :
+#   header | segment* | audio block | segment index | index footer
+# Each segment is self-delimiting (signature + first frame + frame count + payload size)
+# so a truncated or partially downloaded file can still be walked segment by segment.
+SEGMENT_SIGNATURE = b'MSEG'
+SEGMENT_HEADER_FORMAT = '>4sIII'
+SEGMENT_HEADER_SIZE = struct.calcsize(SEGMENT_HEADER_FORMAT)
+INDEX_ENTRY_FORMAT = '>QII'
+INDEX_ENTRY_SIZE = struct.calcsize(INDEX_ENTRY_FORMAT)
+INDEX_SIGNATURE = b'MIDX'
+INDEX_FOOTER_FORMAT = '>QQI4s'
+INDEX_FOOTER_SIZE = struct.calcsize(INDEX_FOOTER_FORMAT)
+DEFAULT_SEGMENT_SIZE = 30
+# A file written to a non-seekable stream (pipe, stdout) cannot patch its header: it is written
+# with the segmented layout and a frame count of 0, and readers take the count from the segments.
+UNKNOWN_FRAME_COUNT = 0
+
 CODEC_OPUS = 1
 CODEC_AAC = 2
 CODEC_MP3 = 3
 
 class MPGIFWriter:
-    def __init__(self, filename, width, height, fps, loop_count=0):
+    def __init__(self, filename, width, height, fps, loop_count=0, segment_size=0, checksums=False, streaming=False):
+        # filename may also be a writable binary stream, left open by write().
         self.filename = filename
+        self._stream = None if isinstance(filename, (str, os.PathLike)) else filename
+        self.name = filename if self._stream is None else getattr(filename, 'name', '<stream>')
         self.width = width
         self.height = height
         self.fps = fps
         self.loop_count = loop_count
+        self.segment_size = segment_size
+        self.checksums = checksums
+        # streaming: frames go to disk as they are added (one segment buffered at most)
+        # instead of being kept in self.frames until write().
+        self.streaming = streaming
         self.frames = []
+        self.frame_count = 0
+        self.segments = []
         self.audio_data = None
         self.audio_codec = CODEC_OPUS
+        self._file = None
+        self._segment = []
+        self._frames_written = 0
+        self._seekable = True
+        self._start = 0
+        self._position = 0
+
+    @property
+    def version(self):
+        if self.checksums:
+            return VERSION_CHECKED
+        return VERSION_SEGMENTED if self.segment_size > 0 else VERSION
 
     def add_frame(self, frame_data):
         """Adds a compressed frame (bytes) to the list."""
-        self.frames.append(frame_data)
+        self.frame_count += 1
+        if not self.streaming:
+            self.frames.append(frame_data)
+            return
+        if self._file is None:
+            self._begin()
+        self._append(frame_data)
 
     def set_audio(self, audio_data, codec=CODEC_OPUS):
         """Sets the compressed audio data."""
@@ -33,86 +92,529 @@ class MPGIFWriter:
         self.audio_codec = codec
 
     def write(self):
-        """Writes the .mpgif file."""
-        with open(self.filename, 'wb') as f:
-            header = struct.pack(
-                HEADER_FORMAT,
-                SIGNATURE,
-                VERSION,
-                self.width,
-                self.height,
-                self.fps,
-                len(self.frames),
-                self.loop_count
-            )
-            f.write(header)
-
+        """Writes the .mpgif file (finalizes it in streaming mode)."""
+        if self._file is None:
+            self._begin()
+        if not self.streaming:
             for frame in self.frames:
-                f.write(struct.pack(FRAME_HEADER_FORMAT, len(frame)))
-                f.write(frame)
+                self._append(frame)
+        self._flush_segment()
+
+        f = self._file
+        try:
+            audio_offset = self._position
+            audio_data = self.audio_data or b''
+            codec = self.audio_codec if audio_data else 0
+            if self.version == VERSION_CHECKED:
+                self._write(struct.pack(AUDIO_HEADER_CHECKED_FORMAT, codec, len(audio_data), zlib.crc32(audio_data)))
+            else:
+                self._write(struct.pack(AUDIO_HEADER_FORMAT, codec, len(audio_data)))
+            self._write(audio_data)
+
+            if self.version >= VERSION_SEGMENTED:
+                self._write_index(audio_offset)
+
+            if self._seekable:
+                end = f.tell()
+                f.seek(self._start)
+                f.write(self._header(final=True))
+                f.seek(end)
+        finally:
+            if self._stream is None:
+                f.close()
+            else:
+                f.flush()
+            self._file = None
+
+        print(f"✅ Fichier {self.name} écrit avec succès ({self.frame_count} frames).")
+
+    def abort(self):
+        """Stops a streaming write and removes the partial file (a stream is only left as is)."""
+        if self._file is not None:
+            if self._stream is None:
+                self._file.close()
+                if os.path.exists(self.filename):
+                    os.remove(self.filename)
+            self._file = None
+
+    def flush(self):
+        """Pushes the segments written so far to the file (for readers following it)."""
+        if self._file is not None:
+            self._file.flush()
+
+    def _header(self, final=False):
+        # Until the header is patched at the end, a segmented file says "count unknown",
+        # so that a partial file can be read like a streamed one.
+        known = self._seekable and (final or self.version < VERSION_SEGMENTED)
+        return struct.pack(
+            HEADER_FORMAT,
+            SIGNATURE,
+            self.version,
+            self.width,
+            self.height,
+            self.fps,
+            self.frame_count if known else UNKNOWN_FRAME_COUNT,
+            self.loop_count
+        )
+
+    def _begin(self):
+        if self._stream is None:
+            self._file = open(self.filename, 'wb')
+        else:
+            self._file = self._stream
+            self._seekable = self._stream.seekable()
+            if self._seekable:
+                self._start = self._stream.tell()
+            elif self.version < VERSION_SEGMENTED:
+                self.segment_size = DEFAULT_SEGMENT_SIZE
+        self._write(self._header())
+
+    def _write(self, data):
+        self._file.write(data)
+        self._position += len(data)
+
+    def _append(self, frame):
+        if self.version >= VERSION_SEGMENTED:
+            self._segment.append(frame)
+            if len(self._segment) >= (self.segment_size or DEFAULT_SEGMENT_SIZE):
+                self._flush_segment()
+        else:
+            self._write(struct.pack(FRAME_HEADER_FORMAT, len(frame)))
+            self._write(frame)
+            self._frames_written += 1
 
-            if self.audio_data:
-                f.write(struct.pack(AUDIO_HEADER_FORMAT, self.audio_codec, len(self.audio_data)))
-                f.write(self.audio_data)
+    def _flush_segment(self):
+        if not self._segment:
+            return
+        chunk = self._segment
+        frame_header_size = FRAME_HEADER_CHECKED_SIZE if self.checksums else FRAME_HEADER_SIZE
+        payload_size = sum(frame_header_size + len(frame) for frame in chunk)
+        self.segments.append((self._position, self._frames_written, len(chunk)))
+        self._write(struct.pack(SEGMENT_HEADER_FORMAT, SEGMENT_SIGNATURE, self._frames_written, len(chunk), payload_size))
+        for frame in chunk:
+            if self.checksums:
+                self._write(struct.pack(FRAME_HEADER_CHECKED_FORMAT, len(frame), zlib.crc32(frame)))
             else:
-                f.write(struct.pack(AUDIO_HEADER_FORMAT, 0, 0))
-        
-        print(f"✅ Fichier {self.filename} écrit avec succès ({len(self.frames)} frames).")
+                self._write(struct.pack(FRAME_HEADER_FORMAT, len(frame)))
+            self._write(frame)
+        self._frames_written += len(chunk)
+        self._segment = []
+
+    def _write_index(self, audio_offset):
+        index_offset = self._position
+        for entry in self.segments:
+            self._write(struct.pack(INDEX_ENTRY_FORMAT, *entry))
+        self._write(struct.pack(INDEX_FOOTER_FORMAT, index_offset, audio_offset, len(self.segments), INDEX_SIGNATURE))
+
+class _BufferStream(io.RawIOBase):
+    """Read-only seekable stream over bytes, bytearray, memoryview or mmap (no copy of the buffer)."""
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast('B')
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def read(self, size=-1):
+        end = len(self._view) if size is None or size < 0 else min(self._pos + size, len(self._view))
+        data = bytes(self._view[self._pos:end])
+        self._pos = max(self._pos, end)
+        return data
+
+    def readinto(self, b):
+        data = self.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self._pos
+        elif whence == os.SEEK_END:
+            offset += len(self._view)
+        self._pos = max(0, offset)
+        return self._pos
+
+    def tell(self):
+        return self._pos
 
 class MPGIFReader:
     def __init__(self, filename):
+        # filename may also be a readable binary stream or a buffer (bytes, bytearray, memoryview, mmap).
+        # Sequential reads (read, read_header, iter_segments, iter_frames) work on any stream;
+        # random access (read_index, read_segment, get_frame, verify) needs a seekable one.
         self.filename = filename
+        if isinstance(filename, (bytes, bytearray, memoryview, mmap.mmap)):
+            filename = _BufferStream(filename)
+        self._stream = None if isinstance(filename, (str, os.PathLike)) else filename
+        self._base = filename.tell() if self._stream is not None and filename.seekable() else 0
+        self._frame_tables = {}
+        self.version = 0
         self.width = 0
         self.height = 0
         self.fps = 0
         self.loop_count = 0
         self.frame_count = 0
         self.frames = []
+        self.segments = []
+        self.audio_offset = None
         self.audio_codec = 0
+        self.audio_size = 0
         self.audio_data = b''
 
-    def read(self):
-        """Reads the .mpgif file and populates attributes."""
+    def _open(self):
+        if self._stream is not None:
+            # A stream is left open; a seekable one is rewound for each access.
+            if self._stream.seekable():
+                self._stream.seek(self._base)
+            return contextlib.nullcontext(self._stream)
         if not os.path.exists(self.filename):
             raise FileNotFoundError(f"Fichier non trouvé: {self.filename}")
+        return open(self.filename, 'rb')
+
+    def _seek(self, f, offset, whence=os.SEEK_SET):
+        return f.seek(self._base + offset if whence == os.SEEK_SET else offset, whence) - self._base
+
+    def _tell(self, f):
+        return f.tell() - self._base
+
+    def _read_header(self, f):
+        header_data = f.read(HEADER_SIZE)
+        if len(header_data) < HEADER_SIZE:
+             raise ValueError("Fichier invalide ou corrompu (header trop court).")
+
+        signature, version, w, h, fps, fc, loop = struct.unpack(HEADER_FORMAT, header_data)
+
+        if signature != SIGNATURE:
+            raise ValueError(f"Signature invalide: {signature} (attendu: {SIGNATURE})")
+        if version not in SUPPORTED_VERSIONS:
+            raise ValueError(f"Version non supportée: {version}")
+
+        self.version = version
+        self.width = w
+        self.height = h
+        self.fps = fps
+        self.frame_count = fc
+        self.loop_count = loop
+
+    @property
+    def streamed(self):
+        """True for a file written without seeking (frame count unknown until the segments are read)."""
+        return self.version >= VERSION_SEGMENTED and self.frame_count == UNKNOWN_FRAME_COUNT
+
+    def _frame_header(self):
+        if self.version == VERSION_CHECKED:
+            return FRAME_HEADER_CHECKED_FORMAT, FRAME_HEADER_CHECKED_SIZE
+        return FRAME_HEADER_FORMAT, FRAME_HEADER_SIZE
+
+    def _iter_frame_data(self, f, count):
+        """Yields up to `count` frames read sequentially (stops quietly at a missing frame header)."""
+        header_format, header_size = self._frame_header()
+        for _ in range(count):
+            len_bytes = f.read(header_size)
+            if len(len_bytes) < header_size:
+                return
+            frame_len, *crc = struct.unpack(header_format, len_bytes)
+            yield self._check_frame(f.read(frame_len), frame_len, crc)
+
+    def _check_frame(self, frame_data, frame_len, crc):
+        if len(frame_data) != frame_len:
+            raise ValueError("Fichier corrompu (frame incomplète).")
+        if crc and zlib.crc32(frame_data) != crc[0]:
+            raise ValueError("Fichier corrompu (checksum de frame invalide).")
+        return frame_data
+
+    def _read_frames(self, f, count):
+        return list(self._iter_frame_data(f, count))
+
+    def _read_segment_header(self, f, signature=b''):
+        data = signature + f.read(SEGMENT_HEADER_SIZE - len(signature))
+        if len(data) < SEGMENT_HEADER_SIZE:
+            raise ValueError("Fichier corrompu (segment incomplet).")
+        signature, first, count, payload_size = struct.unpack(SEGMENT_HEADER_FORMAT, data)
+        if signature != SEGMENT_SIGNATURE:
+            raise ValueError(f"Signature de segment invalide: {signature}")
+        return first, count, payload_size
+
+    def _next_segment_header(self, f, frames_seen):
+        """
+        Returns ((first, count, payload_size), b''), or (None, bytes_read) once all segments are read.
+        For a streamed file the end is found when the next bytes are not a segment signature
+        (they are the start of the audio block, and are returned so it can still be read).
+        """
+        if not self.streamed:
+            if frames_seen >= self.frame_count:
+                return None, b''
+            return self._read_segment_header(f), b''
+        signature = f.read(len(SEGMENT_SIGNATURE))
+        if signature != SEGMENT_SIGNATURE:
+            return None, signature
+        return self._read_segment_header(f, signature), b''
+
+    def _read_audio(self, f, prefix=b''):
+        checked = self.version == VERSION_CHECKED
+        header_format = AUDIO_HEADER_CHECKED_FORMAT if checked else AUDIO_HEADER_FORMAT
+        audio_header_size = struct.calcsize(header_format)
+        audio_header_data = prefix + f.read(audio_header_size - len(prefix))
+
+        if audio_header_data and len(audio_header_data) == audio_header_size:
+            self.audio_codec, audio_len, *crc = struct.unpack(header_format, audio_header_data)
+            self.audio_size = audio_len
+            if audio_len > 0:
+                self.audio_data = f.read(audio_len)
+                if len(self.audio_data) != audio_len:
+                     print("⚠️ Audio tronqué ou incomplet.")
+                elif checked and zlib.crc32(self.audio_data) != crc[0]:
+                    raise ValueError("Fichier corrompu (checksum audio invalide).")
+
+    def read(self):
+        """Reads the .mpgif file and populates attributes."""
+        with self._open() as f:
+            self._read_header(f)
+
+            prefix = b''
+            if self.version >= VERSION_SEGMENTED:
+                while True:
+                    header, prefix = self._next_segment_header(f, len(self.frames))
+                    if header is None:
+                        break
+                    first, count, _ = header
+                    if first != len(self.frames):
+                        raise ValueError("Fichier corrompu (segments désordonnés).")
+                    segment_frames = self._read_frames(f, count)
+                    if len(segment_frames) != count:
+                        raise ValueError("Fichier corrompu (segment incomplet).")
+                    self.frames.extend(segment_frames)
+                self.frame_count = len(self.frames)
+            else:
+                self.frames = self._read_frames(f, self.frame_count)
+
+            self._read_audio(f, prefix)
+
+            print(f"✅ Fichier {self._name()} lu : {self.width}x{self.height} @ {self.fps}fps, {len(self.frames)} frames, Audio: {len(self.audio_data)} bytes")
 
-        with open(self.filename, 'rb') as f:
-            header_data = f.read(HEADER_SIZE)
-            if len(header_data) < HEADER_SIZE:
-                 raise ValueError("Fichier invalide ou corrompu (header trop court).")
-
-            signature, version, w, h, fps, fc, loop = struct.unpack(HEADER_FORMAT, header_data)
-            
-            if signature != SIGNATURE:
-                raise ValueError(f"Signature invalide: {signature} (attendu: {SIGNATURE})")
-            
-            self.width = w
-            self.height = h
-            self.fps = fps
-            self.frame_count = fc
-            self.loop_count = loop
-
-            for _ in range(self.frame_count):
-                len_bytes = f.read(struct.calcsize(FRAME_HEADER_FORMAT))
-                if not len_bytes:
+    def _name(self):
+        return self.filename if self._stream is None else getattr(self._stream, 'name', '<stream>')
+
+    def read_header(self):
+        """
+        Reads only the fixed-size header (and, for a streamed file on a seekable input,
+        the index footer to get the frame count).
+        """
+        with self._open() as f:
+            self._read_header(f)
+            if self.streamed and f.seekable():
+                self._read_directory(f)
+
+    def read_index(self):
+        """
+        Reads the header and the segment directory without loading any frame.
+        Flat (VERSION 1) files are exposed as a single segment.
+        """
+        with self._open() as f:
+            self._read_header(f)
+            if self.version >= VERSION_SEGMENTED:
+                if not self._read_directory(f):
+                    self._scan_segments(f)
+            else:
+                for _ in range(self.frame_count):
+                    len_bytes = f.read(FRAME_HEADER_SIZE)
+                    if len(len_bytes) < FRAME_HEADER_SIZE:
+                        raise ValueError("Fichier corrompu (frame incomplète).")
+                    f.seek(struct.unpack(FRAME_HEADER_FORMAT, len_bytes)[0], os.SEEK_CUR)
+                self.segments = [(HEADER_SIZE, 0, self.frame_count)]
+                self.audio_offset = self._tell(f)
+
+    def _read_directory(self, f):
+        end = self._seek(f, 0, os.SEEK_END)
+        if end < HEADER_SIZE + INDEX_FOOTER_SIZE:
+            return False
+        self._seek(f, end - INDEX_FOOTER_SIZE)
+        index_offset, audio_offset, segment_count, signature = struct.unpack(INDEX_FOOTER_FORMAT, f.read(INDEX_FOOTER_SIZE))
+        if signature != INDEX_SIGNATURE or index_offset + segment_count * INDEX_ENTRY_SIZE != end - INDEX_FOOTER_SIZE:
+            return False
+        self._seek(f, index_offset)
+        directory = f.read(segment_count * INDEX_ENTRY_SIZE)
+        self.segments = [entry for entry in struct.iter_unpack(INDEX_ENTRY_FORMAT, directory)]
+        self.audio_offset = audio_offset
+        if self.streamed:
+            self.frame_count = sum(count for _, _, count in self.segments)
+        return True
+
+    def _scan_segments(self, f):
+        """Rebuilds the directory by walking the segment headers (missing or truncated index)."""
+        self._seek(f, HEADER_SIZE)
+        self.segments = []
+        frames_seen = 0
+        while True:
+            offset = self._tell(f)
+            header, _ = self._next_segment_header(f, frames_seen)
+            if header is None:
+                break
+            first, count, payload_size = header
+            self.segments.append((offset, first, count))
+            f.seek(payload_size, os.SEEK_CUR)
+            frames_seen += count
+        self.audio_offset = offset
+        if self.streamed:
+            self.frame_count = frames_seen
+
+    def read_segment(self, index):
+        """Returns the frames (bytes) of one segment. Requires read_index()."""
+        offset, first, count = self.segments[index]
+        with self._open() as f:
+            self._seek(f, offset)
+            if self.version >= VERSION_SEGMENTED:
+                self._read_segment_header(f)
+            frames = self._read_frames(f, count)
+        if len(frames) != count:
+            raise ValueError("Fichier corrompu (segment incomplet).")
+        return frames
+
+    def read_audio(self):
+        """Loads only the audio block. Requires read_index()."""
+        with self._open() as f:
+            self._seek(f, self.audio_offset)
+            self._read_audio(f)
+        return self.audio_data
+
+    def iter_frames(self):
+        """
+        Yields the frames (bytes) one at a time, reading the file sequentially: works on
+        non-seekable streams and never holds more than one frame. The audio block, which
+        follows the frames, is loaded into audio_data at the end.
+        """
+        with self._open() as f:
+            self._read_header(f)
+            frames_seen = 0
+            if self.version < VERSION_SEGMENTED:
+                for frame_data in self._iter_frame_data(f, self.frame_count):
+                    frames_seen += 1
+                    yield frame_data
+                if frames_seen != self.frame_count:
+                    raise ValueError(f"Fichier corrompu ({frames_seen} frames sur {self.frame_count}).")
+                self._read_audio(f)
+                return
+
+            while True:
+                header, prefix = self._next_segment_header(f, frames_seen)
+                if header is None:
                     break
-                frame_len = struct.unpack(FRAME_HEADER_FORMAT, len_bytes)[0]
-                frame_data = f.read(frame_len)
-                if len(frame_data) != frame_len:
-                    raise ValueError("Fichier corrompu (frame incomplète).")
-                self.frames.append(frame_data)
-
-            audio_header_size = struct.calcsize(AUDIO_HEADER_FORMAT)
-            audio_header_data = f.read(audio_header_size)
-            
-            if audio_header_data and len(audio_header_data) == audio_header_size:
-                self.audio_codec, audio_len = struct.unpack(AUDIO_HEADER_FORMAT, audio_header_data)
-                if audio_len > 0:
-                    self.audio_data = f.read(audio_len)
-                    if len(self.audio_data) != audio_len:
-                         print("⚠️ Audio tronqué ou incomplet.")
-
-            print(f"✅ Fichier {self.filename} lu : {self.width}x{self.height} @ {self.fps}fps, {len(self.frames)} frames, Audio: {len(self.audio_data)} bytes")
+                first, count, _ = header
+                if first != frames_seen:
+                    raise ValueError("Fichier corrompu (segments désordonnés).")
+                for frame_data in self._iter_frame_data(f, count):
+                    frames_seen += 1
+                    yield frame_data
+                if frames_seen != first + count:
+                    raise ValueError("Fichier corrompu (segment incomplet).")
+            self.frame_count = frames_seen
+            self._read_audio(f, prefix)
+
+    def get_frame(self, index):
+        """
+        Returns one frame (bytes) by random access, reading only that frame. Requires read_index().
+        The frame positions of a segment are read (headers only) the first time it is accessed.
+        """
+        if not 0 <= index < self.frame_count:
+            raise IndexError(f"Frame {index} hors limites (0-{self.frame_count - 1})")
+        segment = bisect.bisect_right([first for _, first, _ in self.segments], index) - 1
+        with self._open() as f:
+            table = self._frame_tables.get(segment)
+            if table is None:
+                table = self._frame_tables[segment] = self._read_frame_table(f, segment)
+            offset, frame_len, crc = table[index - self.segments[segment][1]]
+            self._seek(f, offset)
+            return self._check_frame(f.read(frame_len), frame_len, crc)
+
+    def _read_frame_table(self, f, segment):
+        """Walks the frame headers of a segment: [(data_offset, length, [crc] or [])]."""
+        offset, first, count = self.segments[segment]
+        self._seek(f, offset)
+        if self.version >= VERSION_SEGMENTED:
+            self._read_segment_header(f)
+        header_format, header_size = self._frame_header()
+        table = []
+        for _ in range(count):
+            len_bytes = f.read(header_size)
+            if len(len_bytes) < header_size:
+                raise ValueError("Fichier corrompu (frame incomplète).")
+            frame_len, *crc = struct.unpack(header_format, len_bytes)
+            table.append((self._tell(f), frame_len, crc))
+            f.seek(frame_len, os.SEEK_CUR)
+        return table
+
+    def iter_segments(self):
+        """
+        Yields (first_frame, frames) for each complete segment, reading the file sequentially.
+        Stops quietly at the first incomplete segment, so partially downloaded files can be played.
+        """
+        with self._open() as f:
+            self._read_header(f)
+            if self.version < VERSION_SEGMENTED:
+                yield 0, self._read_frames(f, self.frame_count)
+                return
+
+            frames_seen = 0
+            while True:
+                try:
+                    header, _ = self._next_segment_header(f, frames_seen)
+                    if header is None:
+                        break
+                    first, count, _ = header
+                    frames = self._read_frames(f, count)
+                except ValueError:
+                    return
+                if len(frames) != count:
+                    return
+                frames_seen += count
+                yield first, frames
+            if self.streamed:
+                self.frame_count = frames_seen
+
+    def verify(self, deep=False):
+        """
+        Checks the structure (and CRC32 checksums for VERSION_CHECKED files) segment by segment,
+        without keeping frames in memory. With deep=True every WebP frame is also decoded.
+        Raises ValueError on the first problem found.
+        A segmented file must have a valid index, matching the segments found by walking the file.
+        """
+        self.read_index()
+        if self.version >= VERSION_SEGMENTED:
+            self._verify_directory()
+        frames_seen = 0
+        for index, (_, first, count) in enumerate(self.segments):
+            if first != frames_seen:
+                raise ValueError("Fichier corrompu (segments désordonnés).")
+            frames = self.read_segment(index)
+            if deep:
+                from compresseur.multimedia_utils import decompress_frame_webp
+                for i, frame_data in enumerate(frames, start=first):
+                    try:
+                        image = decompress_frame_webp(frame_data)
+                        image.load()
+                    except Exception as e:
+                        raise ValueError(f"Frame {i} illisible: {e}")
+                    if image.size != (self.width, self.height):
+                        raise ValueError(f"Frame {i}: dimensions {image.size} != {self.width}x{self.height}")
+            frames_seen += count
+        if frames_seen != self.frame_count:
+            raise ValueError(f"Fichier corrompu ({frames_seen} frames sur {self.frame_count}).")
+
+        self.read_audio()
+        if len(self.audio_data) != self.audio_size:
+            raise ValueError("Fichier corrompu (audio incomplet).")
+
+    def _verify_directory(self):
+        with self._open() as f:
+            if not self._read_directory(f):
+                raise ValueError("Fichier corrompu (index des segments absent ou invalide).")
+            directory, audio_offset = self.segments, self.audio_offset
+            self._scan_segments(f)
+            if directory != self.segments or audio_offset != self.audio_offset:
+                raise ValueError("Fichier corrompu (index des segments incohérent).")
 
     def get_info(self):
         return {
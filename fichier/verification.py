@@ -0,0 +1,32 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from fichier.mpgif_structure import MPGIFReader
+
+def find_mpgif_files(paths):
+    """Expands directories (recursively) into the .mpgif files they contain."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if name.lower().endswith(".mpgif"):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+def verify_file(path, deep=False):
+    """Returns None if the file is valid, otherwise the error message."""
+    try:
+        MPGIFReader(path).verify(deep=deep)
+        return None
+    except (OSError, ValueError) as e:
+        return str(e)
+
+def verify_files(paths, deep=False, workers=None):
+    """
+    Verifies files concurrently and yields (path, error) in input order.
+    CRC32 and file reads release the GIL, so threads keep the check I/O bound.
+    """
+    files = list(find_mpgif_files(paths))
+    workers = workers or min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        yield from zip(files, pool.map(lambda path: verify_file(path, deep), files))
@@ -1,26 +1,27 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 from tkinter import font as tkfont
-import threading
 import os
 import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from lecteur.player import MPGIFPlayer
-from convertisseur.converter import video_to_mpgif, mpgif_to_video
+# The converters and the player run in job/player processes (lecteur.jobs): the GUI
+# itself does not import OpenCV or pygame.
+from lecteur.jobs import JobManager, JOB_RUNNING, JOB_DONE, JOB_FAILED
 
 BG_COLOR = "#1e1e1e"
 FG_COLOR = "#ffffff"
 ACCENT_COLOR = "#ff9800"
 ACCENT_HOVER = "#e68900"
 SECONDARY_BG = "#2d2d2d"
+JOBS_REFRESH_MS = 250
 
 class MPGIFGui:
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("MPGIF Studio")
-        self.root.geometry("600x450")
+        self.root.geometry("680x480")
         self.root.configure(bg=BG_COLOR)
         
         self.style = ttk.Style()
@@ -45,19 +46,27 @@ class MPGIFGui:
         self.tab_encode = tk.Frame(self.notebook, bg=BG_COLOR)
         self.tab_decode = tk.Frame(self.notebook, bg=BG_COLOR)
         self.tab_play = tk.Frame(self.notebook, bg=BG_COLOR)
+        self.tab_jobs = tk.Frame(self.notebook, bg=BG_COLOR)
 
         self.notebook.add(self.tab_encode, text=" Créer (.mpgif) ")
         self.notebook.add(self.tab_decode, text=" Extraire (.mp4) ")
         self.notebook.add(self.tab_play, text=" Lecture ")
+        self.notebook.add(self.tab_jobs, text=" File d'attente ")
+
+        self.jobs = JobManager()
 
         self.setup_encode_tab()
         self.setup_decode_tab()
         self.setup_play_tab()
+        self.setup_jobs_tab()
         
         self.status_var = tk.StringVar()
         self.status_bar = tk.Label(self.root, textvariable=self.status_var, bg=BG_COLOR, fg="#888888", font=("Segoe UI", 9))
         self.status_bar.pack(side="bottom", fill="x", pady=5)
 
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self.root.after(JOBS_REFRESH_MS, self.poll_jobs)
+
 
     def setup_encode_tab(self):
         frame = self.tab_encode
@@ -126,6 +135,84 @@ class MPGIFGui:
         ttk.Button(frame, text="OUVRIR UN FICHIER", command=self.run_player).pack(ipadx=20, ipady=10)
 
 
+    def setup_jobs_tab(self):
+        frame = self.tab_jobs
+        frame.columnconfigure(0, weight=1)
+        frame.rowconfigure(0, weight=1)
+
+        self.style.configure("Treeview", background=SECONDARY_BG, fieldbackground=SECONDARY_BG, foreground=FG_COLOR)
+        columns = ("job", "status", "progress", "fps", "mbps", "eta")
+        self.jobs_tree = ttk.Treeview(frame, columns=columns, show="headings", height=8)
+        for column, title, width in (("job", "Tâche", 200), ("status", "Statut", 80), ("progress", "Progression", 90),
+                                     ("fps", "FPS", 60), ("mbps", "MB/s", 60), ("eta", "Restant", 70)):
+            self.jobs_tree.heading(column, text=title)
+            self.jobs_tree.column(column, width=width, anchor="w" if column == "job" else "center")
+        self.jobs_tree.grid(row=0, column=0, columnspan=4, sticky="nsew", padx=10, pady=10)
+
+        tk.Label(frame, text="Tâches simultanées :", bg=BG_COLOR, fg=FG_COLOR).grid(row=1, column=0, sticky="e", padx=5)
+        self.jobs_workers = tk.Spinbox(frame, from_=1, to=max(16, os.cpu_count() or 1), width=4,
+                                       command=self.update_workers)
+        self.jobs_workers.delete(0, tk.END)
+        self.jobs_workers.insert(0, str(self.jobs.workers))
+        self.jobs_workers.bind("<Return>", lambda event: self.update_workers())
+        self.jobs_workers.bind("<FocusOut>", lambda event: self.update_workers())
+        self.jobs_workers.grid(row=1, column=1, sticky="w")
+        ttk.Button(frame, text="ANNULER", command=self.cancel_selected_jobs).grid(row=1, column=2, padx=5, pady=10)
+        ttk.Button(frame, text="NETTOYER", command=self.clear_jobs).grid(row=1, column=3, padx=10, pady=10)
+
+    def update_workers(self):
+        try:
+            self.jobs.set_workers(int(self.jobs_workers.get()))
+        except ValueError:
+            pass
+
+    def refresh_jobs(self):
+        rows = set()
+        for job in self.jobs.jobs:
+            rows.add(str(job.id))
+            label = f"{'🎬' if job.kind == 'encode' else '🎞️'} {job.name}"
+            if job.status == JOB_RUNNING:
+                values = (label, job.status, f"{job.percent:.0f}% ({job.frames} frames)", f"{job.fps:.1f}",
+                          f"{job.mb_per_s:.2f}", f"{int(job.eta)}s" if job.eta is not None else "")
+            else:
+                values = (label, job.status, "100%" if job.status == JOB_DONE else "", "", "", "")
+            if self.jobs_tree.exists(str(job.id)):
+                self.jobs_tree.item(str(job.id), values=values)
+            else:
+                self.jobs_tree.insert("", tk.END, iid=str(job.id), values=values)
+        for iid in self.jobs_tree.get_children():
+            if iid not in rows:
+                self.jobs_tree.delete(iid)
+
+    def poll_jobs(self):
+        for job in self.jobs.poll():
+            if job.status == JOB_DONE:
+                self.set_status(f"✅ Terminé : {job.output_path}", "#00ff00")
+            elif job.status == JOB_FAILED:
+                self.set_status(f"❌ Erreur ({job.name}): {job.error}", "#ff0000")
+        running = self.jobs.running()
+        if running:
+            self.set_status(f"⏳ {len(running)} tâche(s) en cours, "
+                            f"{sum(1 for job in self.jobs.jobs if not job.finished) - len(running)} en attente", ACCENT_COLOR)
+        self.refresh_jobs()
+        self.root.after(JOBS_REFRESH_MS, self.poll_jobs)
+
+    def cancel_selected_jobs(self):
+        selected = set(self.jobs_tree.selection())
+        for job in self.jobs.jobs:
+            if str(job.id) in selected and not job.finished:
+                self.jobs.cancel(job)
+                self.set_status(f"⏹️ Annulé : {job.name}")
+        self.refresh_jobs()
+
+    def clear_jobs(self):
+        self.jobs.clear_finished()
+        self.refresh_jobs()
+
+    def close(self):
+        self.jobs.shutdown()
+        self.root.destroy()
+
     def browse_file(self, entry_widget, filetype="all"):
         types = [("Tous les fichiers", "*.*")]
         if filetype == "mpgif":
@@ -174,25 +261,9 @@ class MPGIFGui:
              messagebox.showwarning("Erreur", "Veuillez entrer des nombres valides pour les options.")
              return
 
-        self.set_status(f"⏳ Encodage en cours... ({os.path.basename(inp)})", ACCENT_COLOR)
-        
-        def update_progress(current, total, elapsed, eta):
-            pct = int((current / total) * 100)
-            elapsed_str = f"{int(elapsed)}s"
-            eta_str = f"{int(eta)}s"
-            self.root.after(0, lambda: self.set_status(f"⏳ Encodage: {pct}% | Temps: {elapsed_str} | Restant: {eta_str}", ACCENT_COLOR))
-
-        def encoding_task():
-            try:
-                video_to_mpgif(inp, output_path, target_fps=fps, width=width, quality=quality, loop=loop, progress_callback=update_progress)
-                self.root.after(0, lambda: self.set_status("✅ Encodage terminé avec succès !", "#00ff00"))
-                self.root.after(0, lambda: messagebox.showinfo("Succès", f"Fichier créé : {output_path}"))
-            except Exception as e:
-                err_msg = str(e)
-                self.root.after(0, lambda: self.set_status(f"❌ Erreur: {err_msg}", "#ff0000"))
-                self.root.after(0, lambda: messagebox.showerror("Erreur", err_msg))
-
-        threading.Thread(target=encoding_task, daemon=True).start()
+        self.jobs.submit("encode", output_path, input_path=inp, target_fps=fps, width=width, quality=quality, loop=loop)
+        self.set_status(f"📥 Ajouté à la file : {os.path.basename(inp)}", ACCENT_COLOR)
+        self.refresh_jobs()
 
     def run_decode(self):
         inp = self.dec_input.get()
@@ -209,35 +280,18 @@ class MPGIFGui:
         filename = os.path.splitext(os.path.basename(inp))[0] + ".mp4"
         output_path = os.path.join(out, filename)
 
-        self.set_status(f"⏳ Extraction en cours... ({os.path.basename(inp)})", ACCENT_COLOR)
-        
-        def decoding_task():
-            try:
-                mpgif_to_video(inp, output_path)
-                self.root.after(0, lambda: self.set_status("✅ Extraction terminée avec succès !", "#00ff00"))
-                self.root.after(0, lambda: messagebox.showinfo("Succès", f"Fichier extrait : {output_path}"))
-            except Exception as e:
-                err_msg = str(e)
-                self.root.after(0, lambda: self.set_status(f"❌ Erreur: {err_msg}", "#ff0000"))
-                self.root.after(0, lambda: messagebox.showerror("Erreur", err_msg))
-
-        threading.Thread(target=decoding_task, daemon=True).start()
+        self.jobs.submit("decode", output_path, input_path=inp)
+        self.set_status(f"📥 Ajouté à la file : {os.path.basename(inp)}", ACCENT_COLOR)
+        self.refresh_jobs()
 
     def run_player(self):
-        self.root.withdraw()
-        
         filename = filedialog.askopenfilename(title="Lire un fichier .mpgif", filetypes=[("Fichiers MPGIF", "*.mpgif")])
         if filename:
             self.set_status(f"▶️ Lecture de {os.path.basename(filename)}...")
             try:
-                player = MPGIFPlayer(filename)
-                player.run()
-                self.set_status("Prêt")
-                self.root.deiconify()
+                self.jobs.start_player(filename)
             except Exception as e:
                 self.set_status(f"❌ Erreur lecture: {e}", "#ff0000")
-        else:
-             self.root.deiconify()
 
     def run(self):
         self.root.mainloop()
@@ -0,0 +1,237 @@
+import multiprocessing
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+JOB_QUEUED = "En attente"
+JOB_RUNNING = "En cours"
+JOB_DONE = "Terminé"
+JOB_FAILED = "Erreur"
+JOB_CANCELLED = "Annulé"
+
+PROGRESS_INTERVAL = 0.2  # seconds between two progress messages of a job
+
+# "spawn" everywhere: the job processes do not inherit the Tk state of the GUI, and the
+# behaviour is the same on Linux as on Windows (and in the frozen executable).
+_context = multiprocessing.get_context("spawn")
+
+def _run_job(kind, args, temp_dir, conn):
+    """
+    Entry point of a job process. It leads its own process group (so cancelling also stops
+    the FFmpeg processes it started) and creates its temporary files in temp_dir (removed by
+    the manager whatever the outcome). Progress is sent on conn as ("progress", current,
+    total, elapsed, eta, frames) messages, then ("done",) or ("error", message); frames is
+    the number of frames processed (a decode reports two progress units per frame).
+    """
+    if os.name == 'posix':
+        os.setpgrp()
+    tempfile.tempdir = temp_dir
+    last_sent = [0.0]
+    passes = [1]
+
+    def progress(current, total, elapsed, eta):
+        now = time.monotonic()
+        if now - last_sent[0] >= PROGRESS_INTERVAL or current >= total:
+            last_sent[0] = now
+            conn.send(("progress", current, total, elapsed, eta, current // passes[0]))
+
+    try:
+        if kind == "encode":
+            from convertisseur.converter import video_to_mpgif
+            video_to_mpgif(progress_callback=progress, **args)
+        elif kind == "decode":
+            from convertisseur.converter import mpgif_to_video, DECODE_PROGRESS_PASSES
+            passes[0] = DECODE_PROGRESS_PASSES
+            mpgif_to_video(progress_callback=progress, **args)
+        else:
+            raise ValueError(f"Unknown job kind: {kind}")
+        conn.send(("done",))
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+def _run_player(filename):
+    from lecteur.player import MPGIFPlayer
+    MPGIFPlayer(filename).run()
+
+def _kill_process_tree(process):
+    """Stops a job process and every process it started (FFmpeg)."""
+    if process.exitcode is not None:
+        return
+    if os.name == 'posix':
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            process.kill()
+    else:
+        subprocess.run(['taskkill', '/F', '/T', '/PID', str(process.pid)],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    process.join()
+
+class Job:
+    def __init__(self, job_id, kind, args, output_path):
+        self.id = job_id
+        self.kind = kind
+        self.args = args
+        self.output_path = output_path
+        self.status = JOB_QUEUED
+        self.error = None
+        self.current = 0
+        self.total = 0
+        self.elapsed = 0.0
+        self.eta = None
+        self.frames = 0       # frames processed (current counts progress units)
+        self.process = None
+        self.conn = None
+        self.temp_dir = None
+
+    @property
+    def name(self):
+        return os.path.basename(self.output_path)
+
+    @property
+    def percent(self):
+        return 100 * self.current / self.total if self.total else 0
+
+    @property
+    def fps(self):
+        """Frames processed per second."""
+        return self.frames / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def mb_per_s(self):
+        """Output written per second (the file grows as frames are written)."""
+        try:
+            return os.path.getsize(self.output_path) / self.elapsed / (1024 * 1024) if self.elapsed else 0.0
+        except OSError:
+            return 0.0
+
+    @property
+    def finished(self):
+        return self.status in (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+class JobManager:
+    """
+    Queue of encode/decode jobs run in separate processes, at most `workers` at a time.
+
+    poll() must be called regularly from the GUI thread (Tk after()): it reads the progress
+    of the running jobs, collects the finished ones and starts queued jobs. cancel() kills a
+    running job with its FFmpeg processes, then removes its temporary files and partial output.
+    """
+    def __init__(self, workers=None):
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.jobs = []
+        self.players = []
+        self._next_id = 1
+
+    def submit(self, kind, output_path, **args):
+        """Queues a job: kind "encode" (video_to_mpgif arguments) or "decode" (mpgif_to_video arguments)."""
+        args["output_path"] = output_path
+        job = Job(self._next_id, kind, args, output_path)
+        self._next_id += 1
+        self.jobs.append(job)
+        self._start_queued()
+        return job
+
+    def set_workers(self, workers):
+        self.workers = max(1, workers)
+        self._start_queued()
+
+    def running(self):
+        return [job for job in self.jobs if job.status == JOB_RUNNING]
+
+    def _start_queued(self):
+        running = len(self.running())
+        for job in self.jobs:
+            if running >= self.workers:
+                break
+            if job.status == JOB_QUEUED:
+                self._start(job)
+                running += 1
+
+    def _start(self, job):
+        job.temp_dir = tempfile.mkdtemp(prefix="mpgif_job_")
+        job.conn, child_conn = _context.Pipe(duplex=False)
+        job.process = _context.Process(target=_run_job, args=(job.kind, job.args, job.temp_dir, child_conn), daemon=True)
+        job.process.start()
+        child_conn.close()
+        job.status = JOB_RUNNING
+
+    def _finish(self, job, status, error=None):
+        job.status = status
+        job.error = error
+        if job.process is not None:
+            job.process.join()
+            job.process = None
+        if job.conn is not None:
+            job.conn.close()
+            job.conn = None
+        if job.temp_dir:
+            shutil.rmtree(job.temp_dir, ignore_errors=True)
+            job.temp_dir = None
+        if status != JOB_DONE and os.path.exists(job.output_path):
+            try:
+                os.remove(job.output_path)
+            except OSError:
+                pass
+
+    def poll(self):
+        """Updates the jobs. Returns the jobs that finished since the previous call."""
+        finished = []
+        for job in self.running():
+            outcome = None
+            try:
+                while outcome is None and job.conn.poll():
+                    message = job.conn.recv()
+                    if message[0] == "progress":
+                        job.current, job.total, job.elapsed, job.eta, job.frames = message[1:]
+                    elif message[0] == "done":
+                        outcome = (JOB_DONE, None)
+                    else:
+                        outcome = (JOB_FAILED, message[1])
+            except (EOFError, OSError):
+                outcome = (JOB_FAILED, f"Processus terminé (code {job.process.exitcode})")
+            if outcome is None and job.process.exitcode is not None and not job.conn.poll():
+                outcome = (JOB_FAILED, f"Processus terminé (code {job.process.exitcode})")
+            if outcome:
+                self._finish(job, *outcome)
+                finished.append(job)
+        self._start_queued()
+        return finished
+
+    def cancel(self, job):
+        if job.status == JOB_RUNNING:
+            _kill_process_tree(job.process)
+            self._finish(job, JOB_CANCELLED)
+        elif job.status == JOB_QUEUED:
+            job.status = JOB_CANCELLED
+        self._start_queued()
+
+    def clear_finished(self):
+        self.jobs = [job for job in self.jobs if not job.finished]
+
+    def start_player(self, filename):
+        """Opens the pygame player in its own process (the GUI stays responsive)."""
+        self.players = [process for process in self.players if process.is_alive()]
+        process = _context.Process(target=_run_player, args=(filename,), daemon=True)
+        process.start()
+        self.players.append(process)
+        return process
+
+    def shutdown(self):
+        """Cancels every job and closes the players."""
+        for job in self.jobs:
+            if not job.finished:
+                self.cancel(job)
+        for process in self.players:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+        self.players = []
@@ -1,23 +1,36 @@
 import os
 import sys
-import tempfile
 import pygame
 import io
-import shutil
+import queue
 import subprocess
+import threading
 import tkinter as tk
 from tkinter import filedialog
+import numpy as np
 from PIL import Image
-from fichier.mpgif_structure import MPGIFReader
+from fichier.mpgif_structure import MPGIFReader, CODEC_OPUS, CODEC_AAC, CODEC_MP3
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from compresseur.multimedia_utils import get_ffmpeg_cmd
 
+# File type hints for pygame.mixer.music.load() on an in-memory file.
+AUDIO_NAMEHINTS = {CODEC_MP3: "mp3", CODEC_OPUS: "ogg", CODEC_AAC: "aac"}
+
+# Memory for the frames scaled to the window (32-bit surfaces); beyond it frames are scaled on the fly.
+SCALED_CACHE_BYTES = 256 * 1024 * 1024
+
 class MPGIFPlayer:
-    def __init__(self, filename=None):
+    def __init__(self, filename=None, fullscreen=False):
         self.filename = filename
-        self.temp_dir = tempfile.mkdtemp()
         self.reader = None
-        self.frames = []
+        self.frames = []          # display-format surfaces at the native size
+        self.dirty_rects = []     # per frame: Rect changed since the previous frame (None if identical)
+        self.scaled = {}          # frame index -> surface scaled to the current view
+        self.scaled_capacity = 0  # frames of the current view size that fit in SCALED_CACHE_BYTES
+        self.view = None          # Rect of the picture in the window (aspect ratio kept)
+        self.last_index = None    # frame on screen, None forces a full redraw
+        self.fullscreen = fullscreen
+        self.audio_stream = None  # PCMAudioStream when SDL cannot load the audio itself
         self.running = False
         self.paused = False
         self.clock = None
@@ -46,105 +59,291 @@ class MPGIFPlayer:
         return True
 
     def prepare_assets(self):
+        """Builds display-format surfaces (requires the window) and the per-frame changed regions."""
         print("🖼️ Préparation des frames...")
+        first = previous = None
         for frame_data in self.reader.frames:
             pil_image = Image.open(io.BytesIO(frame_data)).convert("RGB")
-            mode = pil_image.mode
-            size = pil_image.size
             data = pil_image.tobytes()
-            py_image = pygame.image.fromstring(data, size, mode)
-            self.frames.append(py_image)
+            # frombuffer wraps the bytes without a copy; convert() makes the one copy, in the
+            # display pixel format, so blits do not convert pixels again on every frame.
+            self.frames.append(pygame.image.frombuffer(data, pil_image.size, "RGB").convert())
+            pixels = np.frombuffer(data, dtype=np.uint8).reshape(pil_image.size[1], pil_image.size[0], 3)
+            self.dirty_rects.append(_changed_rect(previous, pixels))
+            if first is None:
+                first = pixels
+            previous = pixels
+        if self.dirty_rects:
+            # Looping: the first frame follows the last one.
+            self.dirty_rects[0] = _changed_rect(previous, first)
 
-        if self.reader.audio_data and len(self.reader.audio_data) > 0:
-            audio_ext = ".mp3" if self.reader.audio_codec == 3 else ".opus"
-            audio_temp = os.path.join(self.temp_dir, f"temp{audio_ext}")
-            
-            with open(audio_temp, "wb") as f:
-                f.write(self.reader.audio_data)
-            
+        self.prepare_audio()
+
+    def prepare_audio(self):
+        """
+        Loads the audio block from memory into pygame.mixer.music. If SDL cannot decode it,
+        FFmpeg decodes it to PCM on a pipe instead, played chunk by chunk (PCMAudioStream).
+        """
+        if not self.reader.audio_data or not pygame.mixer.get_init():
+            return
+        audio_ext = AUDIO_NAMEHINTS.get(self.reader.audio_codec, "ogg")
+        try:
+            pygame.mixer.music.load(io.BytesIO(self.reader.audio_data), audio_ext)
+            print(f"🎵 Audio .{audio_ext} chargé (Direct).")
+        except Exception as e:
+            print(f"⚠️ Échec chargement direct audio ({e}). Décodage FFmpeg en flux...")
+            self.audio_stream = PCMAudioStream(self.reader.audio_data)
+
+    def play_audio(self):
+        if not self.reader.audio_data or not pygame.mixer.get_init():
+            return
+        loops = -1 if self.reader.loop_count == 0 else self.reader.loop_count - 1
+        try:
+            if self.audio_stream:
+                self.audio_stream.play(loops=loops)
+            else:
+                pygame.mixer.music.play(loops=loops)
+        except Exception as e:
+            print(f"❌ Erreur lecture audio: {e}")
+
+    def pause_audio(self, paused):
+        if self.audio_stream:
+            self.audio_stream.pause(paused)
+        elif pygame.mixer.get_init():
+            if paused:
+                pygame.mixer.music.pause()
+            else:
+                pygame.mixer.music.unpause()
+
+    def set_window(self, size=None, fullscreen=False):
+        """Opens (or resizes) the window: native size by default, resizable, or fullscreen."""
+        self.fullscreen = fullscreen
+        if fullscreen:
+            self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            self.screen = pygame.display.set_mode(size or (self.reader.width, self.reader.height), pygame.RESIZABLE)
+        self.layout()
+
+    def layout(self):
+        """Fits the picture in the window and drops the frames scaled for the previous size."""
+        window_w, window_h = self.screen.get_size()
+        scale = min(window_w / self.reader.width, window_h / self.reader.height)
+        self.view = pygame.Rect(0, 0, max(1, round(self.reader.width * scale)), max(1, round(self.reader.height * scale)))
+        self.view.center = (window_w // 2, window_h // 2)
+        self.scaled.clear()
+        self.scaled_capacity = SCALED_CACHE_BYTES // (self.view.width * self.view.height * 4)
+        self.last_index = None
+
+    def frame_surface(self, index):
+        """
+        Frame at the view size, cached until the window size changes. Once the cache holds
+        scaled_capacity frames, the others are scaled on every draw: evicting would miss on
+        every frame of a looping animation anyway.
+        """
+        if self.view.size == (self.reader.width, self.reader.height):
+            return self.frames[index]
+        surface = self.scaled.get(index)
+        if surface is None:
             try:
-                pygame.mixer.music.load(audio_temp)
-                print(f"🎵 Audio {audio_ext} chargé (Direct).")
-            except Exception as e:
-                print(f"⚠️ Échec chargement direct audio ({e}). Tentative conversion FFmpeg...")
-                audio_wav = os.path.join(self.temp_dir, "temp.wav")
-                try:
-                    subprocess.run([
-                        get_ffmpeg_cmd(), '-y', '-v', 'error',
-                        '-i', audio_temp,
-                        '-vn', '-acodec', 'pcm_s16le', '-ar', '44100', '-ac', '2',
-                        audio_wav
-                    ], check=True)
-                    
-                    if os.path.exists(audio_wav):
-                        pygame.mixer.music.load(audio_wav)
-                        print("🎵 Audio chargé (via conversion WAV).")
-                except FileNotFoundError:
-                     print("❌ FFmpeg introuvable et échec lecture directe. Pas de son.")
-                except Exception as ex:
-                     print(f"❌ Erreur son finale: {ex}")
+                surface = pygame.transform.smoothscale(self.frames[index], self.view.size)
+            except ValueError:
+                # smoothscale needs 24/32-bit surfaces
+                surface = pygame.transform.scale(self.frames[index], self.view.size)
+            if len(self.scaled) < self.scaled_capacity:
+                self.scaled[index] = surface
+        return surface
+
+    def render_frame(self, index):
+        """
+        Draws a frame. In sequential playback only the region that changed since the previous
+        frame is blitted and sent to the display; otherwise the whole window is redrawn.
+        """
+        surface = self.frame_surface(index)
+        count = len(self.frames)
+        if self.last_index is None or index != (self.last_index + 1) % count:
+            self.screen.fill((0, 0, 0))
+            self.screen.blit(surface, self.view)
+            pygame.display.flip()
+        else:
+            rect = self.dirty_rects[index]
+            if rect is not None:
+                if self.view.size != (self.reader.width, self.reader.height):
+                    scale_x = self.view.width / self.reader.width
+                    scale_y = self.view.height / self.reader.height
+                    # Filtered scaling spreads a change over the neighbouring pixels.
+                    rect = pygame.Rect(int(rect.x * scale_x), int(rect.y * scale_y),
+                                       int(rect.width * scale_x) + 2, int(rect.height * scale_y) + 2)
+                    rect = rect.inflate(2, 2).clip(surface.get_rect())
+                destination = rect.move(self.view.topleft)
+                self.screen.blit(surface, destination, rect)
+                pygame.display.update(destination)
+        self.last_index = index
 
     def run(self):
         if not self.load():
             return
 
         pygame.init()
-        self.screen = pygame.display.set_mode((self.reader.width, self.reader.height))
+        self.set_window(fullscreen=self.fullscreen)
         pygame.display.set_caption(f"MPGIF Player - {os.path.basename(self.filename)}")
         self.clock = pygame.time.Clock()
         
         self.prepare_assets()
-        
-        if pygame.mixer.get_init() and pygame.mixer.music.get_busy() == False:
-            if self.reader.audio_data and len(self.reader.audio_data) > 0:
-                 try:
-                     loops = -1 if self.reader.loop_count == 0 else (self.reader.loop_count - 1 if self.reader.loop_count > 0 else 0)
-                     if self.reader.loop_count == 1: loops = 0
-
-                     pygame.mixer.music.play(loops=loops)
-                 except Exception as e:
-                     print(f"❌ Erreur lecture audio: {e}")
+        self.play_audio()
 
         self.running = True
         frame_idx = 0
         
-        print("▶️ Lecture (Espace: Pause/Play, Echap: Quitter)")
+        print("▶️ Lecture (Espace: Pause/Play, F: Plein écran, Echap: Quitter)")
         
         while self.running:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     self.running = False
+                elif event.type == pygame.VIDEORESIZE and not self.fullscreen:
+                    self.layout()
+                elif event.type == pygame.VIDEOEXPOSE:
+                    self.last_index = None
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
-                        self.running = False
+                        if self.fullscreen:
+                            self.set_window()
+                        else:
+                            self.running = False
+                    elif event.key in (pygame.K_f, pygame.K_F11):
+                        self.set_window(fullscreen=not self.fullscreen)
                     elif event.key == pygame.K_SPACE:
                         self.paused = not self.paused
+                        self.pause_audio(self.paused)
                         if self.paused:
-                            if pygame.mixer.music.get_busy():
-                                pygame.mixer.music.pause()
                             pygame.display.set_caption(f"MPGIF Player - {os.path.basename(self.filename)} [PAUSE]")
                         else:
-                            if pygame.mixer.music.get_busy() or (self.reader.audio_data and len(self.reader.audio_data) > 0):
-                                pygame.mixer.music.unpause()
                             pygame.display.set_caption(f"MPGIF Player - {os.path.basename(self.filename)}")
 
+            if self.audio_stream:
+                self.audio_stream.update()
+
             if not self.paused:
                 if self.frames:
-                    self.screen.blit(self.frames[frame_idx], (0, 0))
+                    self.render_frame(frame_idx)
                     frame_idx = (frame_idx + 1) % len(self.frames)
                 
-                pygame.display.flip()
                 self.clock.tick(self.reader.fps)
             else:
+                if self.last_index is None and self.frames:
+                    # Window resized or exposed while paused: redraw the current frame.
+                    self.render_frame((frame_idx - 1) % len(self.frames))
                 self.clock.tick(10)
 
         self.cleanup()
 
     def cleanup(self):
+        if self.audio_stream:
+            self.audio_stream.stop()
         pygame.quit()
-        shutil.rmtree(self.temp_dir)
         print("Fermeture du lecteur.")
 
+class PCMAudioStream:
+    """
+    Plays compressed audio that SDL cannot load: FFmpeg decodes it to PCM in the mixer's
+    format on a pipe, and chunks of CHUNK_SECONDS are queued on a mixer channel as they
+    arrive (no temporary file, playback starts with the first chunk). update() must be
+    called regularly (every frame) to keep the channel queue fed.
+    """
+    CHUNK_SECONDS = 0.25
+
+    def __init__(self, audio_data):
+        self.audio_data = audio_data
+        self.frequency, size, self.channels = pygame.mixer.get_init()
+        self.chunk_size = int(self.frequency * self.CHUNK_SECONDS) * self.channels * 2
+        self.proc = None
+        self.chunks = None
+        self.channel = None
+        self.loops = 0
+        self.paused = False
+
+    def _start_decoder(self):
+        self.proc = subprocess.Popen(
+            [get_ffmpeg_cmd(), '-v', 'error', '-i', 'pipe:0', '-vn',
+             '-f', 's16le', '-ar', str(self.frequency), '-ac', str(self.channels), 'pipe:1'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        self.chunks = queue.Queue(maxsize=8)
+        threading.Thread(target=self._feed, args=(self.proc,), daemon=True).start()
+        threading.Thread(target=self._read, args=(self.proc, self.chunks), daemon=True).start()
+
+    def _feed(self, proc):
+        try:
+            proc.stdin.write(self.audio_data)
+            proc.stdin.close()
+        except OSError:
+            pass
+
+    def _read(self, proc, chunks):
+        while True:
+            data = proc.stdout.read(self.chunk_size)
+            if not data:
+                break
+            chunks.put(data)
+        chunks.put(None)
+
+    def play(self, loops=0):
+        """loops: extra plays after the first one, -1 for endless (as pygame.mixer.music.play)."""
+        self.stop()
+        self.loops = loops
+        self._start_decoder()
+        self.update()
+
+    def update(self):
+        while self.chunks is not None and (self.channel is None or self.channel.get_queue() is None):
+            try:
+                data = self.chunks.get_nowait()
+            except queue.Empty:
+                return
+            if data is None:
+                self.proc.wait()
+                if self.loops == 0:
+                    self.chunks = None
+                    return
+                if self.loops > 0:
+                    self.loops -= 1
+                self._start_decoder()
+                continue
+            sound = pygame.mixer.Sound(buffer=data)
+            if self.channel is None or not self.channel.get_busy():
+                self.channel = sound.play()
+                if self.paused and self.channel:
+                    self.channel.pause()
+            else:
+                self.channel.queue(sound)
+
+    def pause(self, paused):
+        self.paused = paused
+        if self.channel:
+            if paused:
+                self.channel.pause()
+            else:
+                self.channel.unpause()
+
+    def stop(self):
+        if self.channel:
+            self.channel.stop()
+            self.channel = None
+        if self.proc and self.proc.poll() is None:
+            self.proc.kill()
+            self.proc.wait()
+        self.chunks = None
+
+def _changed_rect(previous, pixels):
+    """Bounding Rect of the pixels that differ between two RGB arrays (whole frame if previous is None)."""
+    if previous is None:
+        return pygame.Rect(0, 0, pixels.shape[1], pixels.shape[0])
+    changed = np.any(previous != pixels, axis=2)
+    rows = np.flatnonzero(changed.any(axis=1))
+    if rows.size == 0:
+        return None
+    cols = np.flatnonzero(changed.any(axis=0))
+    return pygame.Rect(int(cols[0]), int(rows[0]), int(cols[-1] - cols[0] + 1), int(rows[-1] - rows[0] + 1))
+
 if __name__ == "__main__":
     import sys
     fname = sys.argv[1] if len(sys.argv) > 1 else None
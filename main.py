@@ -1,10 +1,9 @@
 import argparse
+import os
 import sys
-import tkinter.messagebox
-import tkinter
-from convertisseur.converter import video_to_mpgif, mpgif_to_video
-from lecteur.player import MPGIFPlayer
-from lecteur.gui import MPGIFGui
+
+# Heavy modules (tkinter, pygame, cv2, PIL, numpy) are imported inside the subcommand
+# that needs them, so that quick commands such as `info` or `verify` start fast.
 
 class NullWriter:
     def write(self, data): pass
@@ -16,10 +15,13 @@ if sys.stderr is None: sys.stderr = NullWriter()
 def main():
     if len(sys.argv) < 2:
         try:
+            from lecteur.gui import MPGIFGui
             gui = MPGIFGui()
             gui.run()
             return
         except Exception as e:
+            import tkinter
+            import tkinter.messagebox
             root = tkinter.Tk()
             root.withdraw()
             tkinter.messagebox.showerror("Fatal Error", f"Impossible to launch the GUI:\n{e}")
@@ -30,48 +32,286 @@ def main():
 
     encode_parser = subparsers.add_parser("encode", help="Convert video to .mpgif", 
                                           formatter_class=argparse.ArgumentDefaultsHelpFormatter)
-    encode_parser.add_argument("input", help="Input video file (MP4, WEBM, GIF, etc.)")
-    encode_parser.add_argument("output", help="Output .mpgif file")
+    encode_parser.add_argument("input", help="Input video file (MP4, WEBM, GIF, etc.), or - for stdin")
+    encode_parser.add_argument("output", help="Output .mpgif file, or - for stdout")
     encode_parser.add_argument("--width", type=int, default=480, help="Target width (height auto-calculated)")
     encode_parser.add_argument("--fps", type=int, default=15, help="Target FPS")
     encode_parser.add_argument("--quality", type=int, default=75, help="WebP quality (0-100)")
     encode_parser.add_argument("--loop", type=int, default=0, help="Loop count (0 for infinite)")
+    encode_parser.add_argument("--segment-size", type=int, default=0, help="Frames per segment (0 for the flat VERSION 1 layout)")
+    encode_parser.add_argument("--checksums", action="store_true", help="Write CRC32 checksums for every frame and the audio block (VERSION 3)")
+    encode_parser.add_argument("--server", default=None, help="Submit the job to a running 'serve' worker on this socket")
+    encode_parser.add_argument("--rendition", action="append", default=None, metavar="WIDTH[:QUALITY]",
+                               help="Encode several renditions in one pass (repeatable); outputs are named OUTPUT_<width>w_q<quality>.mpgif")
+    encode_parser.add_argument("--workers", type=int, default=None, help="Compression threads (default: CPU count)")
+    encode_parser.add_argument("--webp-backend", choices=["pil", "cv2"], default=None, help="WebP encoder used on the decoded arrays (pil if not set)")
+    encode_parser.add_argument("--max-memory", type=int, default=None, help="Memory budget in MB for the frames in flight (sizes the pipeline queues and pools, prints stage metrics)")
+    encode_parser.add_argument("--cache-dir", default=None, help="Reuse the probe, audio and decoded frames of a source encoded before (stored here)")
+    encode_parser.add_argument("--cache-size", type=int, default=2048, help="Cache size limit in MB (least recently used files are evicted)")
+    encode_parser.add_argument("--no-cache-frames", action="store_true", help="Cache only the probe and audio, not the decoded frames")
 
     decode_parser = subparsers.add_parser("decode", help="Convert .mpgif to video",
                                           formatter_class=argparse.ArgumentDefaultsHelpFormatter)
-    decode_parser.add_argument("input", help="Input .mpgif file")
-    decode_parser.add_argument("output", help="Output video file (MP4)")
+    decode_parser.add_argument("input", help="Input .mpgif file, or - for stdin")
+    decode_parser.add_argument("output", help="Output video file (MP4), or - for stdout (fragmented MP4)")
+    decode_parser.add_argument("--max-memory", type=int, default=None, help="Memory budget in MB: frames are decoded and piped to FFmpeg through a bounded pipeline (no temporary frames)")
+    decode_parser.add_argument("--server", default=None, help="Submit the job to a running 'serve' worker on this socket")
+
+    record_parser = subparsers.add_parser("record", help="Encode a live source to .mpgif as frames arrive",
+                                          formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    record_parser.add_argument("source", help="Capture device, URL, growing file, - for stdin, or lavfi:testsrc=size=640x360:rate=30")
+    record_parser.add_argument("output", help="Output .mpgif file")
+    record_parser.add_argument("--format", default=None, help="FFmpeg input format of the source (v4l2, dshow, avfoundation, lavfi...)")
+    record_parser.add_argument("--width", type=int, default=480, help="Target width (height auto-calculated)")
+    record_parser.add_argument("--fps", type=int, default=15, help="Target FPS")
+    record_parser.add_argument("--quality", type=int, default=75, help="WebP quality (0-100)")
+    record_parser.add_argument("--loop", type=int, default=0, help="Loop count (0 for infinite)")
+    record_parser.add_argument("--segment-size", type=int, default=30, help="Frames per segment (written as soon as full)")
+    record_parser.add_argument("--checksums", action="store_true", help="Write CRC32 checksums (VERSION 3)")
+    record_parser.add_argument("--duration", type=float, default=None, help="Stop after this many seconds (default: end of the source or Ctrl+C)")
+    record_parser.add_argument("--audio", action="store_true", help="Also record the source's audio track")
+    record_parser.add_argument("--realtime", action="store_true", help="Read a file source at its native rate (-re), as a live feed")
+    record_parser.add_argument("--workers", type=int, default=None, help="Compression threads (default: CPU count)")
+    record_parser.add_argument("--max-pending", type=int, default=None, help="Frames compressing at once before dropping (default: 2 x workers)")
 
     play_parser = subparsers.add_parser("play", help="Play .mpgif file from CLI",
                                         formatter_class=argparse.ArgumentDefaultsHelpFormatter)
     play_parser.add_argument("input", nargs='?', help="Input .mpgif file (optional, opens picker if empty)")
 
+    transcode_parser = subparsers.add_parser("transcode", help="Resize/re-compress a .mpgif directly (no video round trip)",
+                                             formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    transcode_parser.add_argument("input", help="Input .mpgif file")
+    transcode_parser.add_argument("output", help="Output .mpgif file")
+    transcode_parser.add_argument("--width", type=int, default=None, help="Target width (default: unchanged, height auto-calculated)")
+    transcode_parser.add_argument("--quality", type=int, default=75, help="WebP quality (0-100)")
+    transcode_parser.add_argument("--workers", type=int, default=None, help="Decode/encode threads (default: CPU count)")
+    transcode_parser.add_argument("--max-memory", type=int, default=None, help="Memory budget in MB for the frames in flight (prints stage metrics)")
+
+    remux_parser = subparsers.add_parser("remux", help="Trim/concatenate .mpgif files, change loop or audio (no re-encoding)",
+                                         formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    remux_parser.add_argument("inputs", nargs='+', help="Input .mpgif file(s), concatenated in order")
+    remux_parser.add_argument("-o", "--output", required=True, help="Output .mpgif file")
+    remux_parser.add_argument("--start-frame", type=int, default=0, help="First frame kept")
+    remux_parser.add_argument("--end-frame", type=int, default=None, help="Frame after the last one kept (default: end)")
+    remux_parser.add_argument("--loop", type=int, default=None, help="New loop count (0 for infinite, default: unchanged)")
+    audio_group = remux_parser.add_mutually_exclusive_group()
+    audio_group.add_argument("--strip-audio", action="store_true", help="Drop the audio track")
+    audio_group.add_argument("--audio", default=None, help="Replace the audio track with this file")
+
+    info_parser = subparsers.add_parser("info", help="Print the header of .mpgif files (no frame is read)",
+                                        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    info_parser.add_argument("inputs", nargs='+', help="Input .mpgif files")
+    info_parser.add_argument("--json", action="store_true", help="One JSON object per line")
+
+    verify_parser = subparsers.add_parser("verify", help="Check .mpgif files (structure and checksums)",
+                                          formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    verify_parser.add_argument("inputs", nargs='+', help="Files or directories to check")
+    verify_parser.add_argument("--deep", action="store_true", help="Also decode every WebP frame")
+    verify_parser.add_argument("--workers", type=int, default=None, help="Parallel checks (default: auto)")
+
+    serve_parser = subparsers.add_parser("serve", help="Run a persistent encode worker (JSON-line jobs)",
+                                         formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    serve_parser.add_argument("--socket", default=None, help="Unix socket path (jobs are read from stdin if omitted)")
+    serve_parser.add_argument("--workers", type=int, default=None, help="Compression threads (default: CPU count)")
+    serve_parser.add_argument("--webp-backend", choices=["pil", "cv2"], default=None, help="WebP encoder used on the decoded arrays, for every job (pil if not set)")
+
     ui_parser = subparsers.add_parser("gui", help="Open Desktop GUI Launcher",
                                       formatter_class=argparse.ArgumentDefaultsHelpFormatter)
 
     args = parser.parse_args()
 
-    if args.command == "encode":
+    # "-" streams through stdin/stdout; logs then go to stderr so that stdout only carries the file.
+    input_stream = output_stream = None
+    if args.command in ("encode", "decode"):
+        if args.input == "-":
+            input_stream = sys.stdin.buffer
+        if args.output == "-":
+            output_stream = sys.stdout.buffer
+            sys.stdout = sys.stderr
+        if (input_stream or output_stream) and args.server:
+            parser.error("--server needs file paths (not -)")
+        # The worker's pool and WebP backend are shared by all its jobs: they are set on `serve`.
+        if args.server and args.command == "encode" and args.workers:
+            parser.error("--workers cannot be set per job with --server (use serve --workers)")
+        if args.server and args.command == "encode" and args.webp_backend:
+            parser.error("--webp-backend cannot be set per job with --server (use serve --webp-backend)")
+        if args.command == "encode" and (input_stream or output_stream) and args.rendition:
+            parser.error("--rendition needs file paths (not -)")
+        if args.command == "encode" and input_stream and args.cache_dir:
+            parser.error("--cache-dir needs an input file (not -)")
+        if args.command == "encode" and input_stream and args.max_memory:
+            parser.error("--max-memory needs an input file (not -)")
+
+    max_memory = getattr(args, "max_memory", None)
+    if max_memory:
+        max_memory *= 1024 * 1024
+
+    renditions = None
+    if args.command == "encode" and args.rendition:
+        renditions = []
+        for spec in args.rendition:
+            r_width, _, r_quality = spec.partition(":")
+            renditions.append({"width": int(r_width), "quality": int(r_quality) if r_quality else args.quality})
+
+    if args.command in ("encode", "decode") and args.server:
+        from convertisseur.worker import submit_job
+        job_args = {"input": os.path.abspath(args.input), "output": os.path.abspath(args.output)}
+        if args.command == "encode":
+            job_args.update(target_fps=args.fps, width=args.width, quality=args.quality, loop=args.loop,
+                            segment_size=args.segment_size, checksums=args.checksums, renditions=renditions)
+            if args.cache_dir:
+                job_args.update(cache=os.path.abspath(args.cache_dir), cache_max_bytes=args.cache_size * 1024 * 1024,
+                                cache_frames=not args.no_cache_frames)
+        if max_memory:
+            job_args["max_memory"] = max_memory
+        response = submit_job({"id": 1, "command": args.command, "args": job_args}, args.server)
+        if not response["ok"]:
+            print(f"❌ {response['error']}")
+            sys.exit(1)
+        print(f"✨ {response['result']} ({response['metrics']['seconds']}s)")
+
+    elif args.command == "encode":
+        from concurrent.futures import ThreadPoolExecutor
+        from convertisseur.converter import video_to_mpgif
+        from compresseur.multimedia_utils import set_webp_backend
+        set_webp_backend(args.webp_backend or "pil")
+        cache = None
+        if args.cache_dir:
+            from convertisseur.cache import SourceCache
+            cache = SourceCache(args.cache_dir, max_bytes=args.cache_size * 1024 * 1024,
+                                store_frames=not args.no_cache_frames)
         print(f"🎬 Encoding : {args.input} -> {args.output}")
-        video_to_mpgif(args.input, args.output, 
-                       target_fps=args.fps, 
-                       width=args.width, 
-                       quality=args.quality, 
-                       loop=args.loop)
+        workers = args.workers or os.cpu_count() or 1
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            if input_stream:
+                from convertisseur.converter import video_stream_to_mpgif
+                video_stream_to_mpgif(input_stream, output_stream or args.output,
+                                      target_fps=args.fps,
+                                      width=args.width,
+                                      quality=args.quality,
+                                      loop=args.loop,
+                                      segment_size=args.segment_size,
+                                      checksums=args.checksums,
+                                      executor=pool)
+            else:
+                video_to_mpgif(args.input, output_stream or args.output, 
+                               target_fps=args.fps, 
+                               width=args.width, 
+                               quality=args.quality, 
+                               loop=args.loop,
+                               segment_size=args.segment_size,
+                               checksums=args.checksums,
+                               executor=pool,
+                               renditions=renditions,
+                               cache=cache,
+                               max_memory=max_memory,
+                               workers=workers)
     
     elif args.command == "decode":
         print(f"🎞️ Decoding : {args.input} -> {args.output}")
-        mpgif_to_video(args.input, args.output)
+        if input_stream or output_stream or max_memory:
+            from convertisseur.converter import mpgif_to_video_stream
+            mpgif_to_video_stream(input_stream or args.input, output_stream or args.output, max_memory=max_memory)
+        else:
+            from convertisseur.converter import mpgif_to_video
+            mpgif_to_video(args.input, args.output)
+
+    elif args.command == "record":
+        from concurrent.futures import ThreadPoolExecutor
+        from convertisseur.live import record_live
+        workers = args.workers or os.cpu_count() or 1
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            record_live(args.source, args.output,
+                        target_fps=args.fps,
+                        width=args.width,
+                        quality=args.quality,
+                        loop=args.loop,
+                        segment_size=args.segment_size,
+                        checksums=args.checksums,
+                        executor=pool,
+                        input_format=args.format,
+                        realtime=args.realtime,
+                        duration=args.duration,
+                        audio=args.audio,
+                        max_pending=args.max_pending or workers * 2)
 
     elif args.command == "play":
+        from lecteur.player import MPGIFPlayer
         print(f"▶️ Reading...")
         player = MPGIFPlayer(args.input)
         player.run()
 
+    elif args.command == "transcode":
+        from concurrent.futures import ThreadPoolExecutor
+        from convertisseur.converter import mpgif_to_mpgif
+        workers = args.workers or os.cpu_count() or 1
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            frames = mpgif_to_mpgif(args.input, args.output, width=args.width, quality=args.quality, executor=pool,
+                                    max_memory=max_memory, workers=workers)
+        print(f"✨ Transcoded : {args.output} ({frames} frames)")
+
+    elif args.command == "remux":
+        from convertisseur.remux import remux_mpgif
+        remux_mpgif(args.inputs, args.output,
+                    start_frame=args.start_frame,
+                    end_frame=args.end_frame,
+                    loop=args.loop,
+                    strip_audio=args.strip_audio,
+                    audio_path=args.audio)
+
+    elif args.command == "info":
+        import json
+        from fichier.mpgif_structure import MPGIFReader
+        failures = 0
+        for path in args.inputs:
+            reader = MPGIFReader(path)
+            try:
+                reader.read_header()
+            except (OSError, ValueError) as e:
+                failures += 1
+                print(f"❌ {path}: {e}", file=sys.stderr)
+                continue
+            info = {"file": path, "version": reader.version, "width": reader.width, "height": reader.height,
+                    "fps": reader.fps, "frames": reader.frame_count, "loop": reader.loop_count}
+            if args.json:
+                print(json.dumps(info))
+            else:
+                print(f"{path}: v{reader.version} {reader.width}x{reader.height} @ {reader.fps}fps, "
+                      f"{reader.frame_count} frames, loop: {'Infini' if reader.loop_count == 0 else reader.loop_count}")
+        if failures:
+            sys.exit(1)
+
+    elif args.command == "verify":
+        from fichier.verification import verify_files
+        failures = 0
+        for path, error in verify_files(args.inputs, deep=args.deep, workers=args.workers):
+            if error:
+                failures += 1
+                print(f"❌ {path}: {error}")
+            else:
+                print(f"✅ {path}")
+        if failures:
+            sys.exit(1)
+
+    elif args.command == "serve":
+        from convertisseur.worker import EncodeWorker, serve_stdio, serve_socket
+        worker = EncodeWorker(workers=args.workers, webp_backend=args.webp_backend)
+        try:
+            if args.socket:
+                serve_socket(worker, args.socket)
+            else:
+                serve_stdio(worker)
+        finally:
+            worker.close()
+
     elif args.command == "gui":
+        from lecteur.gui import MPGIFGui
         print("🖥️ GUI Launching...")
         gui = MPGIFGui()
         gui.run()
 
 if __name__ == "__main__":
+    # The GUI runs jobs and the player in "spawn" processes, which re-run this script when frozen.
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
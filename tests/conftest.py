@@ -0,0 +1,19 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compresseur.multimedia_utils import get_ffmpeg_cmd
+
+@pytest.fixture(scope="session")
+def source_video(tmp_path_factory):
+    """A 2 s 320x180 test video at 30 fps, with a sine audio track."""
+    path = str(tmp_path_factory.mktemp("sources") / "source.mp4")
+    subprocess.run([get_ffmpeg_cmd(), '-v', 'error', '-y',
+                    '-f', 'lavfi', '-i', 'testsrc=size=320x180:rate=30:duration=2',
+                    '-f', 'lavfi', '-i', 'sine=frequency=440:duration=2',
+                    '-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-c:a', 'aac', '-shortest', path], check=True)
+    return path
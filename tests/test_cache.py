@@ -0,0 +1,30 @@
+import os
+
+from convertisseur.cache import SourceCache
+from convertisseur.converter import video_to_mpgif
+from fichier.mpgif_structure import MPGIFReader
+
+def test_renditions_of_the_same_width_share_the_frame_cache(source_video, tmp_path):
+    cache = SourceCache(str(tmp_path / "cache"))
+    renditions = [{"width": 160, "quality": 50}, {"width": 160, "quality": 75}]
+    output = str(tmp_path / "out.mpgif")
+
+    video_to_mpgif(source_video, output, renditions=renditions, cache=cache)
+    first = {}
+    for quality in (50, 75):
+        path = str(tmp_path / f"out_160w_q{quality}.mpgif")
+        reader = MPGIFReader(path)
+        reader.verify()
+        assert reader.frame_count == 30
+        with open(path, 'rb') as f:
+            first[quality] = f.read()
+
+    key = cache.source_key(source_video)
+    assert sorted(name for name in os.listdir(tmp_path / "cache" / key) if name.startswith("frames_")) == ["frames_2_160x90.bgr"]
+    assert cache.get_frames(key, 2, 160, 90).shape == (30, 90, 160, 3)
+
+    # Second encode: frames read back from the cache, same output.
+    video_to_mpgif(source_video, output, renditions=renditions, cache=cache)
+    for quality in (50, 75):
+        with open(tmp_path / f"out_160w_q{quality}.mpgif", 'rb') as f:
+            assert f.read() == first[quality]
@@ -0,0 +1,23 @@
+import subprocess
+
+from compresseur.multimedia_utils import get_ffmpeg_cmd
+from convertisseur.live import record_live
+from fichier.mpgif_structure import MPGIFReader
+
+def _mp3_seconds(audio_data):
+    pcm = subprocess.run([get_ffmpeg_cmd(), '-v', 'error', '-f', 'mp3', '-i', 'pipe:0',
+                          '-f', 's16le', '-ac', '1', '-ar', '8000', 'pipe:1'],
+                         input=audio_data, stdout=subprocess.PIPE, check=True).stdout
+    return len(pcm) / 2 / 8000
+
+def test_duration_limits_audio_as_well_as_frames(source_video, tmp_path):
+    output = str(tmp_path / "live.mpgif")
+    record_live(source_video, output, target_fps=10, width=160, duration=1, audio=True,
+                max_pending=1000, max_queue=1000, stats_interval=60)
+
+    reader = MPGIFReader(output)
+    reader.read_index()
+    reader.read_audio()
+    video_seconds = reader.frame_count / reader.fps
+    assert video_seconds == 1.0
+    assert abs(_mp3_seconds(reader.audio_data) - video_seconds) < 0.1
@@ -7,12 +7,16 @@ class MPGIFReader {
         this.fps = 0;
         this.frameCount = 0;
         this.loopCount = 0;
-        this.frames = []; // Array of Blobs (WebP)
+        this.frames = []; // Array of object URLs (WebP), see revoke()
+        this.frameOffsets = []; // [{offset, length}] of every WebP frame in the buffer
         this.audioData = null; // ArrayBuffer (Opus/AAC)
         this.audioCodec = 0;
     }
 
-    read() {
+    // options.urls = false only indexes the frames (frameOffsets) without creating object URLs,
+    // for decoders that read the bytes directly (see MPGIFPlayer).
+    read(options = {}) {
+        this.createUrls = options.urls !== false;
         const signature = this.readString(5);
         if (signature !== "MPGIF") throw new Error("Invalid signature: " + signature);
 
@@ -25,18 +29,30 @@ class MPGIFReader {
 
         console.log(`Parsed Header: ${this.width}x${this.height} @ ${this.fps}fps, ${this.frameCount} frames`);
 
-        for (let i = 0; i < this.frameCount; i++) {
-            const frameLen = this.data.getUint32(this.offset, false); this.offset += 4;
-            const frameBytes = new Uint8Array(this.data.buffer, this.offset, frameLen);
-            this.offset += frameLen;
+        // Version 3 adds a CRC32 after every frame/audio length
+        this.checksumSize = version === 3 ? 4 : 0;
 
-            const blob = new Blob([frameBytes], { type: 'image/webp' });
-            this.frames.push(URL.createObjectURL(blob));
+        if (version >= 2) {
+            // Segmented layout: each segment = "MSEG" + firstFrame + frameCount + payloadSize + frames
+            // A frame count of 0 means a streamed file: segments are read until the audio block.
+            const streamed = this.frameCount === 0;
+            while (streamed ? this.peekString(4) === "MSEG" : this.frameOffsets.length < this.frameCount) {
+                const segSignature = this.readString(4);
+                if (segSignature !== "MSEG") throw new Error("Invalid segment signature: " + segSignature);
+                this.offset += 4; // first frame
+                const segFrames = this.data.getUint32(this.offset, false); this.offset += 4;
+                this.offset += 4; // payload size
+                this.readFrames(segFrames);
+            }
+            if (streamed) this.frameCount = this.frameOffsets.length;
+        } else {
+            this.readFrames(this.frameCount);
         }
 
         if (this.offset < this.data.byteLength) {
             this.audioCodec = this.data.getUint8(this.offset++);
             const audioLen = this.data.getUint32(this.offset, false); this.offset += 4;
+            this.offset += this.checksumSize;
 
             if (audioLen > 0) {
                 this.audioData = this.data.buffer.slice(this.offset, this.offset + audioLen);
@@ -46,6 +62,39 @@ class MPGIFReader {
         }
     }
 
+    readFrames(count) {
+        for (let i = 0; i < count; i++) {
+            const frameLen = this.data.getUint32(this.offset, false); this.offset += 4;
+            this.offset += this.checksumSize;
+            this.frameOffsets.push({ offset: this.offset, length: frameLen });
+            if (this.createUrls) {
+                const frameBytes = new Uint8Array(this.data.buffer, this.offset, frameLen);
+                const blob = new Blob([frameBytes], { type: 'image/webp' });
+                this.frames.push(URL.createObjectURL(blob));
+            }
+            this.offset += frameLen;
+        }
+    }
+
+    frameBlob(index) {
+        const { offset, length } = this.frameOffsets[index];
+        return new Blob([new Uint8Array(this.data.buffer, offset, length)], { type: 'image/webp' });
+    }
+
+    // Releases the object URLs created by read().
+    revoke() {
+        this.frames.forEach(url => URL.revokeObjectURL(url));
+        this.frames = [];
+    }
+
+    peekString(length) {
+        if (this.offset + length > this.data.byteLength) return "";
+        const start = this.offset;
+        const str = this.readString(length);
+        this.offset = start;
+        return str;
+    }
+
     readString(length) {
         let str = "";
         for (let i = 0; i < length; i++) {
@@ -54,3 +103,382 @@ class MPGIFReader {
         return str;
     }
 }
+
+// URL of this script, so that it can also be started as the decoding worker.
+const MPGIF_SCRIPT_URL = (typeof document !== 'undefined' && document.currentScript) ? document.currentScript.src : null;
+
+// Seconds of audio scheduled ahead of the audio clock (topped up by tick()).
+const AUDIO_SCHEDULE_AHEAD = 1.0;
+
+/*
+ * Decoding side of MPGIFPlayer, run in a Web Worker (this same file).
+ * Keeps at most `ringSize` decoded ImageBitmaps: the frames from the current one onwards,
+ * decoded ahead with createImageBitmap and closed as soon as they fall out of the window.
+ * Frames are drawn on the transferred OffscreenCanvas, or sent to the page when there is none.
+ */
+class MPGIFDecoder {
+    constructor(buffer, canvas, ringSize) {
+        this.reader = new MPGIFReader(buffer);
+        this.reader.read({ urls: false });
+        this.canvas = canvas;
+        this.ctx = canvas ? canvas.getContext('2d') : null;
+        if (canvas) {
+            canvas.width = this.reader.width;
+            canvas.height = this.reader.height;
+        }
+        this.ringSize = Math.max(1, Math.min(ringSize, this.reader.frameCount));
+        this.ring = new Map();      // frame index -> ImageBitmap
+        this.decoding = new Map();  // frame index -> Promise<ImageBitmap>
+        this.current = 0;
+        this.decodedFrames = 0;
+        this.decodeTime = 0;
+        this.fill();
+    }
+
+    inWindow(index) {
+        const n = this.reader.frameCount;
+        return (index - this.current + n) % n < this.ringSize;
+    }
+
+    decode(index) {
+        let promise = this.decoding.get(index);
+        if (!promise) {
+            const start = performance.now();
+            promise = createImageBitmap(this.reader.frameBlob(index)).then(bitmap => {
+                this.decoding.delete(index);
+                this.decodedFrames++;
+                this.decodeTime += performance.now() - start;
+                if (this.inWindow(index) && !this.ring.has(index)) {
+                    this.ring.set(index, bitmap);
+                } else {
+                    bitmap.close();
+                }
+                this.fill();
+                return this.ring.get(index);
+            }, error => {
+                // A frame that cannot be decoded must not stay "in progress": it would block
+                // the window (two decodes at a time) and be awaited forever.
+                this.decoding.delete(index);
+                throw error;
+            });
+            this.decoding.set(index, promise);
+        }
+        return promise;
+    }
+
+    // Evicts the frames behind the window and starts decoding the missing ones (two at a time).
+    fill() {
+        for (const [index, bitmap] of this.ring) {
+            if (!this.inWindow(index)) {
+                bitmap.close();
+                this.ring.delete(index);
+            }
+        }
+        for (let i = 0; i < this.ringSize && this.decoding.size < 2; i++) {
+            const index = (this.current + i) % this.reader.frameCount;
+            // Prefetch errors are reported when the frame is shown (and decoded again).
+            if (!this.ring.has(index) && !this.decoding.has(index)) this.decode(index).catch(() => {});
+        }
+    }
+
+    // Draws a frame if it is decoded (or once decoded with wait); returns false if it was not ready.
+    async show(index, wait) {
+        this.current = index;
+        this.fill();
+        let bitmap = this.ring.get(index);
+        if (!bitmap && wait) bitmap = await this.decode(index);
+        if (!bitmap) return { shown: false };
+        if (this.ctx) {
+            this.ctx.drawImage(bitmap, 0, 0);
+            return { shown: true };
+        }
+        // No OffscreenCanvas: hand the bitmap over to the page (which closes it).
+        this.ring.delete(index);
+        this.current = (index + 1) % this.reader.frameCount;
+        this.fill();
+        return { shown: true, bitmap };
+    }
+
+    stats() {
+        const frameBytes = this.reader.width * this.reader.height * 4;
+        return {
+            decodedFrames: this.decodedFrames,
+            decodeFps: this.decodeTime > 0 ? this.decodedFrames * 1000 / this.decodeTime : 0,
+            ringFrames: this.ring.size,
+            ringBytes: this.ring.size * frameBytes,
+        };
+    }
+
+    close() {
+        this.ring.forEach(bitmap => bitmap.close());
+        this.ring.clear();
+    }
+}
+
+if (typeof WorkerGlobalScope !== 'undefined' && self instanceof WorkerGlobalScope) {
+    let decoder = null;
+    self.onmessage = async (e) => {
+        const msg = e.data;
+        try {
+            if (msg.type === 'load') {
+                decoder = new MPGIFDecoder(msg.buffer, msg.canvas, msg.ringSize);
+                const r = decoder.reader;
+                const audio = r.audioData;
+                self.postMessage({ id: msg.id, type: 'loaded', width: r.width, height: r.height, fps: r.fps,
+                                   frameCount: r.frameCount, loopCount: r.loopCount,
+                                   audioCodec: r.audioCodec, audioData: audio }, audio ? [audio] : []);
+            } else if (msg.type === 'show') {
+                const result = await decoder.show(msg.frame, msg.wait);
+                self.postMessage({ id: msg.id, type: 'shown', frame: msg.frame, ...result },
+                                 result.bitmap ? [result.bitmap] : []);
+            } else if (msg.type === 'stats') {
+                self.postMessage({ id: msg.id, type: 'stats', ...decoder.stats() });
+            } else if (msg.type === 'close') {
+                if (decoder) decoder.close();
+                self.close();
+            }
+        } catch (err) {
+            self.postMessage({ id: msg.id, type: 'error', message: err.message });
+        }
+    };
+}
+
+/*
+ * Page side: parsing and decoding run in a Web Worker, which draws on the canvas through
+ * transferControlToOffscreen() and keeps a bounded ring of decoded frames, so long clips and
+ * many players on one page keep a flat memory use and a free main thread.
+ *
+ * Playback follows the audio clock (AudioContext.currentTime) when the file has a track the
+ * browser can decode, otherwise performance.now(). On every animation frame the player shows
+ * the frame due at the clock's position: frames whose time has passed are dropped, and the
+ * previous frame is held while the due one is not decoded yet (see stats()).
+ *
+ *     const player = new MPGIFPlayer(canvas, { ringSize: 8 });
+ *     await player.load('animation.mpgif');   // URL, Blob/File or ArrayBuffer
+ *     player.play();
+ */
+class MPGIFPlayer {
+    constructor(canvas, options = {}) {
+        this.canvas = canvas;
+        this.ringSize = options.ringSize || 8;
+        this.useAudio = options.audio !== false;
+        this.onended = options.onended || null;
+        this.worker = new Worker(options.workerUrl || MPGIF_SCRIPT_URL);
+        this.nextId = 0;
+        this.requests = new Map();
+        this.worker.onmessage = (e) => this.onMessage(e.data);
+        this.offscreen = typeof canvas.transferControlToOffscreen === 'function';
+        this.ctx = null;
+        this.playing = false;
+        this.frame = -1;      // frame on screen
+        this.requested = -1;  // last frame asked to the worker
+        this.inFlight = false;
+        this.rafId = null;
+        this.audioContext = null;
+        this.audioBuffer = null;
+        this.audioSources = null;  // one source per video loop, scheduled ahead; null: audio stopped
+        this.audioLoop = 0;        // next video loop to schedule audio for
+        this.audioStart = 0;       // audioContext.currentTime at position 0
+        this.clockStart = 0;  // performance.now() at position 0 (no audio)
+        this.position = 0;    // seconds, while paused
+        this.lastPosition = -1;
+        this.playback = { presented: 0, dropped: 0, held: 0, clock: 'performance' };
+    }
+
+    request(message, transfer = []) {
+        const id = this.nextId++;
+        return new Promise((resolve, reject) => {
+            this.requests.set(id, { resolve, reject });
+            this.worker.postMessage({ ...message, id }, transfer);
+        });
+    }
+
+    onMessage(msg) {
+        const pending = this.requests.get(msg.id);
+        if (!pending) return;
+        this.requests.delete(msg.id);
+        if (msg.type === 'error') pending.reject(new Error(msg.message));
+        else pending.resolve(msg);
+    }
+
+    async load(source) {
+        let buffer = source;
+        if (typeof source === 'string') buffer = await (await fetch(source)).arrayBuffer();
+        else if (source instanceof Blob) buffer = await source.arrayBuffer();
+
+        let canvas = null;
+        if (this.offscreen) {
+            canvas = this.canvas.transferControlToOffscreen();
+        } else {
+            this.ctx = this.canvas.getContext('2d');
+        }
+        const info = await this.request({ type: 'load', buffer, canvas, ringSize: this.ringSize },
+                                        canvas ? [buffer, canvas] : [buffer]);
+        Object.assign(this, { width: info.width, height: info.height, fps: info.fps, frameCount: info.frameCount,
+                              loopCount: info.loopCount, audioCodec: info.audioCodec, audioData: info.audioData });
+        this.duration = this.frameCount / this.fps;
+        if (!this.offscreen) {
+            this.canvas.width = info.width;
+            this.canvas.height = info.height;
+        }
+        if (this.audioData && this.useAudio) await this.loadAudio();
+        await this.showFrame(0, true);
+        return info;
+    }
+
+    async loadAudio() {
+        const AudioContextClass = window.AudioContext || window.webkitAudioContext;
+        if (!AudioContextClass) return;
+        try {
+            this.audioContext = new AudioContextClass();
+            this.audioBuffer = await this.audioContext.decodeAudioData(this.audioData.slice(0));
+            // An audio context blocked by the autoplay policy starts on a later user gesture:
+            // the audio is then started at the current position and takes over the clock.
+            this.audioContext.onstatechange = () => {
+                if (this.playing && this.audioContext.state === 'running' && !this.audioSources) {
+                    this.startAudio(this.currentTime());
+                }
+            };
+        } catch (e) {
+            console.error("Audio decode error, playing without sound:", e);
+            this.audioBuffer = null;
+        }
+    }
+
+    // Playback position in seconds (not wrapped by loops).
+    currentTime() {
+        if (!this.playing) return this.position;
+        if (this.audioSources) {
+            // Output latency: what is heard now was scheduled slightly earlier.
+            const latency = this.audioContext.outputLatency || this.audioContext.baseLatency || 0;
+            return Math.max(0, this.audioContext.currentTime - this.audioStart - latency);
+        }
+        return (performance.now() - this.clockStart) / 1000;
+    }
+
+    startAudio(position) {
+        this.audioStart = this.audioContext.currentTime - position;
+        this.audioSources = [];
+        this.audioLoop = Math.floor(position / this.duration);
+        this.playback.clock = 'audio';
+        this.scheduleAudio();
+    }
+
+    // The audio restarts from its beginning at every video loop (cut at the video length if it
+    // is longer, silent until the next loop if it is shorter): each loop gets its own source,
+    // started at the exact loop boundary on the audio clock, so the two never drift apart.
+    scheduleAudio() {
+        const ctx = this.audioContext;
+        this.audioSources = this.audioSources.filter(entry => entry.end > ctx.currentTime);
+        while ((this.loopCount === 0 || this.audioLoop < this.loopCount)
+               && this.audioStart + this.audioLoop * this.duration < ctx.currentTime + AUDIO_SCHEDULE_AHEAD) {
+            const start = this.audioStart + this.audioLoop * this.duration;
+            const end = start + Math.min(this.duration, this.audioBuffer.duration);
+            this.audioLoop++;
+            if (end <= ctx.currentTime) continue;
+            const source = ctx.createBufferSource();
+            source.buffer = this.audioBuffer;
+            source.connect(ctx.destination);
+            // A loop already under way (play, seek, late top-up) starts from the matching offset.
+            const late = Math.max(0, ctx.currentTime - start);
+            source.start(start + late, late);
+            source.stop(end);
+            this.audioSources.push({ source, end });
+        }
+    }
+
+    stopAudio() {
+        if (!this.audioSources) return;
+        for (const { source } of this.audioSources) {
+            try { source.stop(); } catch (e) { /* not started */ }
+            source.disconnect();
+        }
+        this.audioSources = null;
+    }
+
+    // Draws one frame; with wait the frame is decoded first if needed, otherwise
+    // the previous frame stays on screen. Resolves to true if the frame was drawn.
+    async showFrame(index, wait = false) {
+        this.requested = index;
+        this.inFlight = true;
+        try {
+            const result = await this.request({ type: 'show', frame: index, wait });
+            if (result.bitmap) {
+                this.ctx.drawImage(result.bitmap, 0, 0);
+                result.bitmap.close();
+            }
+            if (result.shown) this.frame = index;
+            return result.shown;
+        } finally {
+            this.inFlight = false;
+        }
+    }
+
+    play() {
+        if (this.playing) return;
+        const position = this.position;
+        this.playing = true;
+        this.clockStart = performance.now() - position * 1000;
+        this.playback.clock = 'performance';
+        if (this.audioBuffer) {
+            if (this.audioContext.state === 'running') this.startAudio(position);
+            else this.audioContext.resume();
+        }
+        this.lastPosition = Math.floor(position * this.fps) - 1;
+        this.rafId = requestAnimationFrame(() => this.tick());
+    }
+
+    tick() {
+        if (!this.playing) return;
+        if (this.audioSources) this.scheduleAudio();
+        const position = Math.floor(this.currentTime() * this.fps);
+        if (this.loopCount > 0 && position >= this.loopCount * this.frameCount) {
+            this.pause();
+            this.position = this.loopCount * this.duration;
+            if (this.frame !== this.frameCount - 1) this.showFrame(this.frameCount - 1, true);
+            if (this.onended) this.onended();
+            return;
+        }
+        if (position > this.lastPosition && !this.inFlight) {
+            // Frames whose time passed while the previous one was decoding or drawing are skipped.
+            this.playback.dropped += Math.max(0, position - this.lastPosition - 1);
+            this.lastPosition = position;
+            this.showFrame(position % this.frameCount).then(shown => {
+                if (shown) this.playback.presented++;
+                else this.playback.held++;
+            });
+        }
+        this.rafId = requestAnimationFrame(() => this.tick());
+    }
+
+    pause() {
+        this.position = this.currentTime();
+        this.playing = false;
+        this.stopAudio();
+        if (this.rafId !== null) cancelAnimationFrame(this.rafId);
+        this.rafId = null;
+    }
+
+    async seek(index) {
+        const playing = this.playing;
+        if (playing) this.pause();
+        this.position = index / this.fps;
+        await this.showFrame(index % this.frameCount, true);
+        if (playing) this.play();
+    }
+
+    // Playback counters (presented, dropped, held frames and the clock in use) and decoder state.
+    async stats() {
+        const decoder = await this.request({ type: 'stats' });
+        delete decoder.id;
+        delete decoder.type;
+        return { ...this.playback, ...decoder };
+    }
+
+    destroy() {
+        this.pause();
+        if (this.audioContext) this.audioContext.close();
+        this.worker.postMessage({ type: 'close' });
+        this.requests.clear();
+    }
+}